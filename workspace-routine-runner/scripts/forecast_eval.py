@@ -0,0 +1,183 @@
+"""
+Batch evaluator for wttr.in forecasts (?format=j1).
+
+All locations' 3-day hourly grids are flattened into one set of columns
+(location, time, temp, feels-like, wind, precip chance, ...) and every
+threshold is computed for all rows at once: with NumPy as vectorised array
+comparisons, without it as plain list comprehensions over the same columns.
+Weather descriptions are classified once per distinct string rather than
+once per hour, since a 3-day grid only uses a handful of them.
+
+The result is a timeline per location: runs of consecutive forecast slots
+where a condition (precip, snow, heat, cold, wind) holds.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python path gives the same results
+    np = None
+
+PRECIP_KEYWORDS = ("rain", "drizzle", "shower", "thunderstorm", "snow", "sleet", "ice", "hail", "mist", "fog")
+SNOW_KEYWORDS = ("snow", "sleet", "ice", "blizzard")
+CONDITIONS = ("precip", "snow", "heat", "cold", "wind")
+
+NUMERIC_COLUMNS = {
+    "temp": "tempF",
+    "feels": "FeelsLikeF",
+    "wind": "windspeedMiles",
+    "gust": "WindGustMiles",
+    "precip_in": "precipInches",
+    "rain_chance": "chanceofrain",
+    "snow_chance": "chanceofsnow",
+}
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ForecastGrid:
+    """Columnar view of the hourly forecasts of many locations."""
+
+    def __init__(self):
+        self.locations: List[str] = []
+        self.location: List[int] = []  # row -> index into self.locations
+        self.time: List[datetime] = []
+        self.description: List[str] = []
+        self.columns: Dict[str, List[float]] = {name: [] for name in NUMERIC_COLUMNS}
+
+    @classmethod
+    def from_wttr(cls, forecasts: Dict[str, dict]) -> "ForecastGrid":
+        grid = cls()
+        for name, data in forecasts.items():
+            if not data:
+                continue
+            loc = len(grid.locations)
+            grid.locations.append(name)
+            for day in data.get("weather", []):
+                try:
+                    date = datetime.strptime(day.get("date", ""), "%Y-%m-%d")
+                except ValueError:
+                    continue
+                for hour in day.get("hourly", []):
+                    # "time" is hhmm without padding: "0", "300", ... "2100"
+                    minutes = int(_number(hour.get("time", 0)))
+                    grid.location.append(loc)
+                    grid.time.append(date + timedelta(hours=minutes // 100, minutes=minutes % 100))
+                    desc = hour.get("weatherDesc") or [{}]
+                    grid.description.append(desc[0].get("value", "").lower())
+                    for column, key in NUMERIC_COLUMNS.items():
+                        grid.columns[column].append(_number(hour.get(key)))
+        return grid
+
+    def __len__(self):
+        return len(self.time)
+
+
+def _classify_descriptions(descriptions: List[str]):
+    """(precip, snow) keyword flags per row, scanning each distinct description once."""
+    flags = {}
+    for desc in set(descriptions):
+        flags[desc] = (any(kw in desc for kw in PRECIP_KEYWORDS), any(kw in desc for kw in SNOW_KEYWORDS))
+    return [flags[d][0] for d in descriptions], [flags[d][1] for d in descriptions]
+
+
+def evaluate(grid: ForecastGrid, hot: float, cold: float, wind: float, chance: float = 50) -> Dict[str, List[bool]]:
+    """Boolean column per condition, one entry per grid row."""
+    desc_precip, desc_snow = _classify_descriptions(grid.description)
+    c = grid.columns
+    if np is not None and len(grid):
+        a = {name: np.asarray(values, dtype=float) for name, values in c.items()}
+        snow = np.asarray(desc_snow, dtype=bool) | (a["snow_chance"] >= chance)
+        masks = {
+            "precip": np.asarray(desc_precip, dtype=bool) | (a["rain_chance"] >= chance) | snow,
+            "snow": snow,
+            "heat": np.maximum(a["temp"], a["feels"]) >= hot,
+            "cold": np.minimum(a["temp"], a["feels"]) <= cold,
+            "wind": a["wind"] >= wind,
+        }
+        return {name: mask.tolist() for name, mask in masks.items()}
+
+    snow = [d or s >= chance for d, s in zip(desc_snow, c["snow_chance"])]
+    return {
+        "precip": [d or r >= chance or s for d, r, s in zip(desc_precip, c["rain_chance"], snow)],
+        "snow": snow,
+        "heat": [max(t, f) >= hot for t, f in zip(c["temp"], c["feels"])],
+        "cold": [min(t, f) <= cold for t, f in zip(c["temp"], c["feels"])],
+        "wind": [w >= wind for w in c["wind"]],
+    }
+
+
+def build_timeline(grid: ForecastGrid, masks: Dict[str, List[bool]]) -> Dict[str, List[dict]]:
+    """Per location, sorted events {condition, start, end, peak} from runs of consecutive True rows.
+
+    end is the start of the last matching slot; peak is the most extreme value in the run.
+    """
+    peak_column = {"precip": "rain_chance", "snow": "snow_chance", "heat": "feels", "cold": "feels", "wind": "wind"}
+    timeline = {name: [] for name in grid.locations}
+    for condition, mask in masks.items():
+        values = grid.columns[peak_column[condition]]
+        pick = min if condition == "cold" else max
+        run = None
+        for row, hit in enumerate(mask):
+            if run and (not hit or grid.location[row] != run["loc"]):
+                timeline[grid.locations[run["loc"]]].append(run["event"])
+                run = None
+            if not hit:
+                continue
+            if run is None:
+                run = {"loc": grid.location[row],
+                       "event": {"condition": condition, "start": grid.time[row], "end": grid.time[row],
+                                 "peak": values[row]}}
+            else:
+                run["event"]["end"] = grid.time[row]
+                run["event"]["peak"] = pick(run["event"]["peak"], values[row])
+        if run:
+            timeline[grid.locations[run["loc"]]].append(run["event"])
+    for events in timeline.values():
+        events.sort(key=lambda e: (e["start"], CONDITIONS.index(e["condition"])))
+    return timeline
+
+
+def evaluate_forecasts(forecasts: Dict[str, dict], hot: float, cold: float, wind: float,
+                       chance: float = 50) -> Dict[str, List[dict]]:
+    grid = ForecastGrid.from_wttr(forecasts)
+    return build_timeline(grid, evaluate(grid, hot, cold, wind, chance))
+
+
+def local_now(data: dict, utc_now: datetime = None) -> datetime:
+    """Wall-clock time at a wttr.in location, naive like the grid's times (which are location-local).
+
+    current_condition gives the same observation as localObsDateTime (local) and
+    observation_time (UTC); their difference is the location's UTC offset. Falls back
+    to the host's local time when either is missing.
+    """
+    utc_now = utc_now or datetime.now(timezone.utc)
+    try:
+        current = data["current_condition"][0]
+        local_obs = datetime.strptime(current["localObsDateTime"], "%Y-%m-%d %I:%M %p")
+        utc_obs = datetime.strptime(current["observation_time"], "%I:%M %p")
+    except (KeyError, IndexError, TypeError, ValueError):
+        return datetime.now()
+    minutes = (local_obs.hour * 60 + local_obs.minute) - (utc_obs.hour * 60 + utc_obs.minute)
+    minutes = (minutes + 12 * 60) % (24 * 60) - 12 * 60  # offsets run from UTC-12 to UTC+12 (+14 wraps, rare)
+    offset = timedelta(minutes=round(minutes / 15) * 15)
+    return (utc_now + offset).replace(tzinfo=None)
+
+
+def next_event(events: List[dict], condition: str, now: datetime, hours: float) -> Optional[dict]:
+    """First event of condition with a slot overlapping [now, now + hours] (slots are 3 hours long).
+
+    now must be the location's local time (local_now()), not the host's.
+    """
+    window_end = now + timedelta(hours=hours)
+    for e in events:
+        if e["condition"] == condition and e["start"] <= window_end and e["end"] + timedelta(hours=3) > now:
+            return e
+    return None
@@ -4,14 +4,36 @@ NWS + wttr.in Weather Alert Monitor
 Dual-channel monitoring:
 1. NWS API - Severe weather alerts
 2. wttr.in - Any precipitation (rain/snow), extreme temps, high wind
+
+Announced alerts are remembered in ~/.openclaw/state/weather-alert until they
+expire; each run writes only new / updated / cancelled alerts.
+
+Deltas are queued in pending-alerts.json until a reader acknowledges them, and
+ALERT_FILE always shows everything still pending. --daemon only queues, so a
+delta found between the 3x/day cron runs is not overwritten by the next poll;
+the one-shot run (the cron job) delivers and acknowledges the whole queue,
+and --ack clears it without polling. State updates from the daemon and a
+one-shot run are serialised with a file lock, and only one daemon may run.
 """
 
+import argparse
+import fcntl
 import json
 import os
+import signal
+import sys
 import time
 import hashlib
-import urllib.request
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+# Shared pooled HTTP client lives in ~/.openclaw/workspace/openclaw_common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "workspace"))
+from openclaw_common.fetch_pool import FetchPool
+from openclaw_common.http_client import HttpClient
+from openclaw_common.state_file import atomic_write, load_json
+from forecast_eval import evaluate_forecasts, local_now, next_event
 
 # Configuration
 USER_LOCATION = "Trenton+NJ"
@@ -27,6 +49,18 @@ ZONE_IDS = [
     "NYZ072",  # NYC
 ]
 
+# wttr.in locations evaluated in one batch (one per zone above)
+FORECAST_LOCATIONS = [
+    "Trenton+NJ",         # NJZ015 Mercer (user home)
+    "Newton+NJ",          # NJZ006 Sussex
+    "Belvidere+NJ",       # NJZ007 Warren
+    "Morristown+NJ",      # NJZ008 Morris
+    "New+Brunswick+NJ",   # NJZ012 Middlesex
+    "Freehold+NJ",        # NJZ013 Western Monmouth
+    "New+York+NY",        # NYZ072 NYC
+]
+FORECAST_WINDOW_HOURS = 3  # precipitation this close ahead counts as "expected"
+
 # NWS Alert types to filter
 SEVERE_EVENTS = [
     # Winter Weather
@@ -63,62 +97,180 @@ TEMP_HOT_THRESHOLD = 95
 TEMP_COLD_THRESHOLD = 25
 WIND_THRESHOLD = 25  # mph
 
-def get_nws_alerts():
-    """Fetch severe weather alerts from NWS API"""
-    all_alerts = []
-    for zone_id in ZONE_IDS:
-        url = f"https://api.weather.gov/alerts/active?zone={zone_id}"
+# Persistent state (~/.openclaw/state/weather-alert)
+STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "state", "weather-alert")
+NWS_CACHE_PATH = os.path.join(STATE_DIR, "nws-cache.json")
+SEEN_ALERTS_PATH = os.path.join(STATE_DIR, "seen-alerts.json")
+FORECAST_TIMELINE_PATH = os.path.join(STATE_DIR, "forecast-timeline.json")
+PENDING_PATH = os.path.join(STATE_DIR, "pending-alerts.json")
+LOCK_PATH = os.path.join(STATE_DIR, "state.lock")
+DAEMON_LOCK_PATH = os.path.join(STATE_DIR, "daemon.lock")
+ALERT_FILE = "/tmp/nws-weather-alert.txt"
+MAX_PENDING = 200  # unacknowledged deltas kept; the oldest are dropped beyond this
+
+# --daemon polling interval (seconds): fast while alerts/precipitation are active, backing off to slow when calm
+POLL_FAST = 5 * 60
+POLL_SLOW = 30 * 60
+
+# wttr.in alerts carry no expiry; forget them this long after they were last seen
+WTTR_ALERT_TTL = timedelta(hours=6)
+
+NWS_ALERTS_URL = "https://api.weather.gov/alerts/active"
+NWS_HEADERS = {"Accept": "application/geo+json"}
+
+# One keep-alive client for api.weather.gov and wttr.in
+http = HttpClient(user_agent="OpenClaw-Weather-Alert/1.0", timeout=10)
+
+def write_atomic(path, text):
+    """Atomic write (readers never see a partial file), creating the state directory on first use"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, text)
+
+def save_state(path, data):
+    """Write a JSON state file atomically"""
+    write_atomic(path, json.dumps(data))
+
+@contextmanager
+def file_lock(path, blocking=True):
+    """Exclusive flock on path; non-blocking raises BlockingIOError if someone else holds it"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
         try:
-            req = urllib.request.Request(url, headers={"User-Agent": "OpenClaw-Weather-Alert/1.0"})
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode())
-        except Exception as e:
-            print(f"Error fetching NWS {zone_id}: {e}")
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def fetch_nws_features():
+    """All active alerts for ZONE_IDS in one request; unchanged polls are a 304 served from cache"""
+    cache = load_json(NWS_CACHE_PATH, {})
+    headers = dict(NWS_HEADERS)
+    if cache.get("zones") == ZONE_IDS and cache.get("last_modified"):
+        headers["If-Modified-Since"] = cache["last_modified"]
+    resp = http.get(f"{NWS_ALERTS_URL}?zone={','.join(ZONE_IDS)}", headers=headers)
+    if resp.status == 304 and "features" in cache:
+        print("  -> NWS alerts not modified (cached)")
+        return cache["features"]
+    resp.raise_for_status()
+    features = resp.json().get("features", [])
+    try:
+        save_state(NWS_CACHE_PATH, {"zones": ZONE_IDS, "last_modified": resp.header("last-modified"),
+                                    "features": features})
+    except OSError as e:
+        print(f"Error saving NWS cache: {e}")
+    return features
+
+def fetch_nws_features_per_zone():
+    """Fallback: poll each zone concurrently over the shared connection pool"""
+    def fetch_zone(zone_id):
+        return http.get(NWS_ALERTS_URL, params={"zone": zone_id}, headers=NWS_HEADERS,
+                        raise_for_status=True).json().get("features", [])
+
+    features = {}
+    polled = set()
+    for result in FetchPool(max_workers=len(ZONE_IDS), per_host_limit=4).map(fetch_zone, ZONE_IDS):
+        if not result.ok:
+            print(f"Error fetching NWS {result.item}: {result.error}")
             continue
-            
-        if not data or "features" not in data:
+        polled.add(result.item)
+        for feature in result.value:
+            # An alert covering several zones comes back once per zone; keep one copy
+            features.setdefault(feature.get("id") or id(feature), feature)
+    return list(features.values()), polled
+
+def alert_zones(props):
+    """Our zones an alert applies to, from its UGC codes / affectedZones URLs"""
+    codes = set(props.get("geocode", {}).get("UGC", []))
+    codes.update(url.rstrip("/").rsplit("/", 1)[-1] for url in props.get("affectedZones", []))
+    return [zone_id for zone_id in ZONE_IDS if zone_id in codes]
+
+def get_nws_alerts():
+    """Fetch severe weather alerts from NWS API; returns (alerts, zones that were polled successfully)"""
+    all_alerts = []
+    try:
+        features, polled = fetch_nws_features(), set(ZONE_IDS)
+    except Exception as e:
+        print(f"Error fetching NWS multi-zone alerts: {e} - polling zones individually")
+        features, polled = fetch_nws_features_per_zone()
+
+    for feature in features:
+        props = feature.get("properties", {})
+        event = props.get("event", "")
+        if not any(sev in event for sev in SEVERE_EVENTS):
             continue
-            
-        for feature in data.get("features", []):
-            props = feature.get("properties", {})
-            event = props.get("event", "")
-            
-            if any(sev in event for sev in SEVERE_EVENTS):
-                alert_info = {
-                    "source": "NWS",
-                    "zone": zone_id,
-                    "event": event,
-                    "severity": props.get("severity", ""),
-                    "headline": props.get("headline", ""),
-                    "effective": props.get("effective", ""),
-                    "expires": props.get("expires", ""),
-                }
-                alert_hash = hashlib.md5(
-                    f"{zone_id}{event}{props.get('sent', '')}".encode()
-                ).hexdigest()
-                alert_info["hash"] = alert_hash
-                all_alerts.append(alert_info)
+
+        for zone_id in alert_zones(props):
+            alert_info = {
+                "source": "NWS",
+                "zone": zone_id,
+                "event": event,
+                "severity": props.get("severity", ""),
+                "headline": props.get("headline", ""),
+                "effective": props.get("effective", ""),
+                "expires": props.get("expires", ""),
+                "sent": props.get("sent", ""),
+                "message_type": props.get("messageType", ""),
+            }
+            alert_hash = hashlib.md5(
+                f"{zone_id}{event}{props.get('sent', '')}".encode()
+            ).hexdigest()
+            alert_info["hash"] = alert_hash
+            all_alerts.append(alert_info)
     
-    return all_alerts
+    return all_alerts, polled
 
-def get_wttr_weather():
+def get_wttr_weather(location=USER_LOCATION):
     """Fetch weather from wttr.in"""
     try:
-        url = f"https://wttr.in/{USER_LOCATION}?format=j1"
-        req = urllib.request.Request(url, headers={"User-Agent": "OpenClaw-Weather-Alert/1.0"})
-        with urllib.request.urlopen(req, timeout=10) as response:
-            return json.loads(response.read().decode())
+        url = f"https://wttr.in/{location}?format=j1"
+        return http.get(url, raise_for_status=True).json()
     except Exception as e:
-        print(f"Error fetching wttr.in: {e}")
+        print(f"Error fetching wttr.in {location}: {e}")
         return None
 
-def check_wttr_alerts():
-    """Check wttr.in for precipitation, extreme temps, high wind"""
+def get_forecasts():
+    """Fetch all FORECAST_LOCATIONS concurrently; unreachable locations map to None"""
+    locations = list(dict.fromkeys([USER_LOCATION] + FORECAST_LOCATIONS))
+    results = FetchPool(max_workers=len(locations), per_host_limit=4).map(get_wttr_weather, locations)
+    return {result.item: result.value for result in results}
+
+def check_forecast_timeline(forecasts):
+    """Precip/snow/heat/cold/wind timeline over the full 3-day grid of every location"""
+    timeline = evaluate_forecasts(forecasts, TEMP_HOT_THRESHOLD, TEMP_COLD_THRESHOLD, WIND_THRESHOLD)
+    for location, events in timeline.items():
+        if events:
+            summary = ", ".join(f"{e['condition']} {e['start']:%a %H:%M}" for e in events[:4])
+            print(f"  -> {location.replace('+', ' ')}: {summary}{' ...' if len(events) > 4 else ''}")
+    serialisable = {loc: [dict(e, start=e["start"].isoformat(), end=e["end"].isoformat()) for e in events]
+                    for loc, events in timeline.items()}
+    try:
+        save_state(FORECAST_TIMELINE_PATH, {"generated": datetime.now().isoformat(), "locations": serialisable})
+    except OSError as e:
+        print(f"Error saving forecast timeline: {e}")
+    return timeline
+
+def format_window(event):
+    """'Mon 15:00-Mon 21:00' for a forecast timeline event (None: current conditions only)"""
+    if event is None:
+        return "now"
+    return f"{event['start']:%a %H:%M}-{event['end'] + timedelta(hours=3):%a %H:%M}"
+
+def wttr_alert(kind, event, severity, description, window, **extra):
+    """A wttr.in alert: kind is its identity across polls, event + window make up its hash,
+    so Rain -> Snow or a shifted window is reported as updated"""
+    alert = {"source": "wttr.in", "kind": kind, "event": event, "severity": severity,
+             "description": description, "window": window, **extra}
+    alert["hash"] = hashlib.md5(f"{kind}{event}{window}".encode()).hexdigest()
+    return alert
+
+def check_wttr_alerts(data=None, timeline=None):
+    """Check wttr.in for precipitation, extreme temps, high wind; None if wttr.in was unreachable"""
     alerts = []
-    data = get_wttr_weather()
+    if data is None:
+        data = get_wttr_weather()
     
     if not data:
-        return alerts
+        return None
     
     try:
         current = data.get("current_condition", [{}])[0]
@@ -146,30 +298,23 @@ def check_wttr_alerts():
         snow_keywords = ["snow", "sleet", "ice", "blizzard"]
         has_snow = any(kw in weatherDesc for kw in snow_keywords)
         
-        # Check for any rain/snow in forecast (next 3 hours)
-        weather_data = data.get("weather", [])
-        forecast_precip = False
-        if weather_data and len(weather_data) > 0:
-            hourly_data = weather_data[0].get("hourly", [])[:3]
-            for hour in hourly_data:
-                hour_desc = hour.get("weatherDesc", [{}])
-                if hour_desc:
-                    hour_text = hour_desc[0].get("value", "").lower()
-                    if any(kw in hour_text for kw in precip_keywords):
-                        forecast_precip = True
-                        break
+        # Check for any rain/snow in forecast (next FORECAST_WINDOW_HOURS hours)
+        if timeline is None:
+            timeline = evaluate_forecasts({USER_LOCATION: data}, TEMP_HOT_THRESHOLD, TEMP_COLD_THRESHOLD,
+                                          WIND_THRESHOLD).get(USER_LOCATION, [])
+        now = local_now(data)  # forecast times are local to the location, not to this host
+        def window(condition):
+            return next_event(timeline, condition, now, FORECAST_WINDOW_HOURS)
+        forecast_precip = window("precip")
         
         # Build alert if conditions met - ANY rain or snow
         if has_precip or has_snow or forecast_precip:
-            precip_type = "Snow" if has_snow else "Rain"
-            alert_info = {
-                "source": "wttr.in",
-                "event": f"{precip_type} Expected",
-                "severity": "Advisory",
-                "description": f"Current: {weatherDesc} ({temp_f}°F). {precip_type} in forecast: {forecast_precip}",
-                "wind": f"{wind_mph} mph",
-                "hash": "wttr-precip",
-            }
+            forecast_snow = window("snow")
+            precip_type = "Snow" if has_snow or forecast_snow else "Rain"
+            alert_info = wttr_alert(
+                "wttr-precip", f"{precip_type} Expected", "Advisory",
+                f"Current: {weatherDesc} ({temp_f}°F)",
+                format_window(forecast_snow or forecast_precip), wind=f"{wind_mph} mph")
             alerts.append(alert_info)
             print(f"  -> Precipitation detected: {weatherDesc}")
         
@@ -180,36 +325,27 @@ def check_wttr_alerts():
             feelslike_f = temp_f
         
         if temp_f >= TEMP_HOT_THRESHOLD or feelslike_f >= TEMP_HOT_THRESHOLD:
-            alert_info = {
-                "source": "wttr.in",
-                "event": "Extreme Heat",
-                "severity": "Warning",
-                "description": f"Temperature: {temp_f}°F (feels like {feelslike_f}°F, >= {TEMP_HOT_THRESHOLD}°F)",
-                "hash": "wttr-heat",
-            }
+            alert_info = wttr_alert(
+                "wttr-heat", "Extreme Heat", "Warning",
+                f"Temperature: {temp_f}°F (feels like {feelslike_f}°F, >= {TEMP_HOT_THRESHOLD}°F)",
+                format_window(window("heat")))
             alerts.append(alert_info)
             print(f"  -> Extreme heat: {temp_f}°F (feels {feelslike_f}°F)")
         
         if temp_f <= TEMP_COLD_THRESHOLD or feelslike_f <= TEMP_COLD_THRESHOLD:
-            alert_info = {
-                "source": "wttr.in",
-                "event": "Extreme Cold",
-                "severity": "Warning",
-                "description": f"Temperature: {temp_f}°F (feels like {feelslike_f}°F, <= {TEMP_COLD_THRESHOLD}°F)",
-                "hash": "wttr-cold",
-            }
+            alert_info = wttr_alert(
+                "wttr-cold", "Extreme Cold", "Warning",
+                f"Temperature: {temp_f}°F (feels like {feelslike_f}°F, <= {TEMP_COLD_THRESHOLD}°F)",
+                format_window(window("cold")))
             alerts.append(alert_info)
             print(f"  -> Extreme cold: {temp_f}°F (feels {feelslike_f}°F)")
         
         # Check high wind
         if wind_mph >= WIND_THRESHOLD:
-            alert_info = {
-                "source": "wttr.in",
-                "event": "High Wind",
-                "severity": "Advisory",
-                "description": f"Wind: {wind_mph} mph (>= {WIND_THRESHOLD} mph)",
-                "hash": "wttr-wind",
-            }
+            alert_info = wttr_alert(
+                "wttr-wind", "High Wind", "Advisory",
+                f"Wind: {wind_mph} mph (>= {WIND_THRESHOLD} mph)",
+                format_window(window("wind")))
             alerts.append(alert_info)
             print(f"  -> High wind: {wind_mph} mph")
             
@@ -218,50 +354,198 @@ def check_wttr_alerts():
     
     return alerts
 
-def save_alerts(nws_alerts, wttr_alerts):
-    """Save alerts to file"""
-    if not nws_alerts and not wttr_alerts:
-        print("No weather alerts found")
+def alert_key(alert):
+    """Identity of an alert across polls: NWS event per zone, wttr.in condition kind"""
+    if alert["source"] == "NWS":
+        return f"NWS|{alert['zone']}|{alert['event']}"
+    return f"{alert['source']}|{alert.get('kind', alert['hash'])}"
+
+def parse_time(value):
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def diff_alerts(alerts, seen, polled, now=None):
+    """Compare this poll against the seen-alert store.
+
+    polled: {"NWS": zones polled successfully, "wttr.in": bool}. Alerts of a
+    source/zone that could not be polled are left untouched rather than
+    reported as cancelled. Returns (delta, new_seen) where delta has "new",
+    "updated" and "cancelled" lists.
+    """
+    now = now or datetime.now(timezone.utc)
+    current = {}
+    cancel_keys = set()
+    for alert in alerts:
+        key = alert_key(alert)
+        if alert.get("message_type") == "Cancel":
+            cancel_keys.add(key)
+        elif key not in current or alert.get("sent", "") >= current[key].get("sent", ""):
+            current[key] = alert
+
+    delta = {"new": [], "updated": [], "cancelled": []}
+    new_seen = {}
+    for key, record in seen.items():
+        expires = parse_time(record.get("expires"))
+        if expires and expires <= now:
+            continue  # ran out on its own: nothing to announce
+        was_polled = (record.get("zone") in polled.get("NWS", ()) if record.get("source") == "NWS"
+                      else polled.get(record.get("source"), False))
+        if key not in current and (key in cancel_keys or was_polled):
+            delta["cancelled"].append(record["alert"])
+        elif key not in current:
+            new_seen[key] = record
+
+    for key, alert in current.items():
+        previous = seen.get(key)
+        if previous is None:
+            delta["new"].append(alert)
+        elif previous.get("hash") != alert["hash"]:
+            delta["updated"].append(alert)
+        expires = alert.get("expires") or (now + WTTR_ALERT_TTL).isoformat()
+        new_seen[key] = {"source": alert["source"], "zone": alert.get("zone"), "hash": alert["hash"],
+                         "expires": expires, "alert": alert,
+                         "first_seen": (previous or {}).get("first_seen", now.isoformat())}
+    return delta, new_seen
+
+def format_alert(alert):
+    if alert["source"] == "NWS":
+        msg = f"• **{alert['event']}** ({alert['zone']})\n"
+        msg += f"  Severity: {alert['severity']}\n"
+        if alert.get('headline'):
+            msg += f"  {alert['headline'][:100]}\n"
+    else:
+        msg = f"• **{alert['event']}** (wttr.in)\n"
+        msg += f"  {alert.get('description', '')}\n"
+        if alert.get("window", "now") != "now":
+            msg += f"  Forecast: {alert['window']}\n"
+    return msg + "\n"
+
+def format_delta(delta):
+    msg = ""
+    sections = [("new", "⚠️ **New Alerts**"), ("updated", "🔄 **Updated Alerts**"),
+                ("cancelled", "✅ **Cancelled / Ended**")]
+    for kind, title in sections:
+        if delta[kind]:
+            msg += title + "\n"
+            msg += "".join(format_alert(alert) for alert in delta[kind])
+    return msg
+
+def queue_delta(delta, now=None):
+    """Append a non-empty delta to the unacknowledged queue; returns the queue"""
+    pending = load_json(PENDING_PATH, [])
+    if any(delta.values()):
+        pending.append({"at": (now or datetime.now()).isoformat(timespec="minutes"), "delta": delta})
+        pending = pending[-MAX_PENDING:]
+        save_state(PENDING_PATH, pending)
+    return pending
+
+def acknowledge():
+    """The reader has the alerts: clear the queue (ALERT_FILE goes on the next run without changes)"""
+    save_state(PENDING_PATH, [])
+
+def save_alerts(pending):
+    """Write every unacknowledged delta to ALERT_FILE; nothing pending leaves no alert file"""
+    if not pending:
+        print("No new or changed weather alerts")
+        if os.path.exists(ALERT_FILE):
+            os.remove(ALERT_FILE)  # don't let downstream re-announce the previous run
         return
     
     msg = "🌤️ **Weather Alert** 🌤️\n\n"
+    for entry in pending:
+        if len(pending) > 1:
+            msg += f"🕒 {entry['at'].replace('T', ' ')}\n"
+        msg += format_delta(entry["delta"])
     
-    if nws_alerts:
-        msg += "⚠️ **NWS Severe Alerts**\n"
-        for alert in nws_alerts:
-            msg += f"• **{alert['event']}** ({alert['zone']})\n"
-            msg += f"  Severity: {alert['severity']}\n"
-            if alert.get('headline'):
-                msg += f"  {alert['headline'][:100]}\n"
-            msg += "\n"
-    
-    if wttr_alerts:
-        msg += "📡 **Local Weather Alerts (wttr.in)**\n"
-        for alert in wttr_alerts:
-            msg += f"• **{alert['event']}**\n"
-            msg += f"  {alert.get('description', '')}\n"
-            msg += "\n"
-    
-    with open("/tmp/nws-weather-alert.txt", "w") as f:
-        f.write(msg)
+    write_atomic(ALERT_FILE, msg)
     
     print(msg)
 
-def main():
+def run_once(deliver=True):
+    """One poll of both channels; returns whether anything is active.
+
+    deliver=True (the one-shot run) acknowledges everything pending once it is
+    written out; the daemon leaves it queued for the next reader.
+    """
     print(f"[{datetime.now()}] Checking weather alerts...")
     
     # Channel 1: NWS severe alerts
     print("  [NWS] Checking severe weather alerts...")
-    nws_alerts = get_nws_alerts()
+    nws_alerts, nws_polled = get_nws_alerts()
     if nws_alerts:
         print(f"  -> Found {len(nws_alerts)} NWS alerts")
     
-    # Channel 2: wttr.in precipitation/temp/wind
-    print("  [wttr.in] Checking local weather...")
-    wttr_alerts = check_wttr_alerts()
+    # Channel 2: wttr.in precipitation/temp/wind, all forecast locations in one batch
+    print("  [wttr.in] Checking local weather and forecasts...")
+    forecasts = get_forecasts()
+    timeline = check_forecast_timeline(forecasts)
+    user_forecast = forecasts.get(USER_LOCATION)
+    wttr_alerts = check_wttr_alerts(user_forecast, timeline.get(USER_LOCATION)) if user_forecast else None
     
-    # Save combined alerts
-    save_alerts(nws_alerts, wttr_alerts)
+    # Report only the delta against what was already announced. The seen store is re-read
+    # under the lock: a daemon and a cron one-shot may both be polling
+    polled = {"NWS": nws_polled, "wttr.in": wttr_alerts is not None}
+    with file_lock(LOCK_PATH):
+        delta, seen = diff_alerts(nws_alerts + (wttr_alerts or []), load_json(SEEN_ALERTS_PATH, {}), polled)
+        print(f"  -> {len(delta['new'])} new, {len(delta['updated'])} updated, {len(delta['cancelled'])} cancelled")
+        pending = queue_delta(delta)  # queued before the seen store moves on, so a delta is never lost
+        save_alerts(pending)
+        save_state(SEEN_ALERTS_PATH, seen)
+        if deliver and pending:
+            acknowledge()
+    return bool(nws_alerts or wttr_alerts)
+
+def run_daemon(fast=POLL_FAST, slow=POLL_SLOW):
+    """Poll until SIGTERM/SIGINT, reusing connections between polls; deltas stay queued for the cron run"""
+    try:
+        with file_lock(DAEMON_LOCK_PATH, blocking=False):
+            return _daemon_loop(fast, slow)
+    except BlockingIOError:
+        print(f"Another weather alert daemon is already running ({DAEMON_LOCK_PATH})")
+        return 1
+
+def _daemon_loop(fast, slow):
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    interval = fast
+    while not stop.is_set():
+        try:
+            active = run_once(deliver=False)
+        except Exception as e:
+            print(f"Error during poll: {e}")
+            active = False
+        # Active weather: poll fast. Calm: double the interval each poll up to the slow rate
+        interval = fast if active else min(slow, interval * 2)
+        print(f"  -> next poll in {interval}s")
+        sys.stdout.flush()
+        stop.wait(interval)
+    print(f"[{datetime.now()}] Weather alert daemon stopped")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="NWS + wttr.in weather alert monitor")
+    parser.add_argument("--daemon", action="store_true", help="keep running and poll on an adaptive interval")
+    parser.add_argument("--fast-interval", type=int, default=POLL_FAST,
+                        help="seconds between polls while alerts are active")
+    parser.add_argument("--slow-interval", type=int, default=POLL_SLOW,
+                        help="longest interval between polls when calm")
+    parser.add_argument("--ack", action="store_true",
+                        help="acknowledge the queued alerts without polling (for readers of the alert file)")
+    args = parser.parse_args()
+
+    if args.ack:
+        with file_lock(LOCK_PATH):
+            acknowledge()
+        return 0
+    if args.daemon:
+        return run_daemon(args.fast_interval, args.slow_interval)
+    run_once()
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: ranking and top-k selection as the candidate count grows.
+
+    python3 bench_ranking.py [--sizes 1000,10000,50000] [--k 20] [--repeat 5] [--json results.json]
+
+Candidates are synthetic but shaped like a run's deduplicated videos
+(published_at spread over 120 days, view/like counts for most, a mix of
+sources and channels). Weights come from youtube-scouter-config.yaml.
+For every size it reports the full ranking (feature extraction + heap
+selection of the top k) next to feature extraction + a full sort, plus the
+selection step alone on precomputed scores: heapq.nlargest vs sorted()[:k],
+and the diverse selection (channel/topic caps + MMR, lazy greedy heap) with
+the config's output settings. Per-candidate cost should stay flat as the
+size grows.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+YOUTUBE_DIR = os.path.join(HERE, "..", "youtube_scouter")
+sys.path.insert(0, YOUTUBE_DIR)
+from ranking import DEFAULT_WEIGHTS, Ranker  # noqa: E402
+from selection import DiverseSelector  # noqa: E402
+
+SOURCES = (["rss"], ["search"], ["scrape"], ["rss", "search"])
+TOPICS = ["", "llm research", "agentic ai", "robotics", "state space models", "computer vision"]
+TITLE_WORDS = ("llm agents transformer attention robot vision mamba diffusion rust async tutorial guide "
+               "deep dive explained paper review course benchmark scratch inference training").split()
+
+
+def load_config() -> dict:
+    try:
+        import yaml
+        with open(os.path.join(YOUTUBE_DIR, "youtube-scouter-config.yaml")) as f:
+            return yaml.safe_load(f)
+    except (ImportError, OSError):
+        return {"scoring": {"weights": DEFAULT_WEIGHTS}, "output": {}}
+
+
+def make_candidates(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    videos = []
+    for i in range(n):
+        views = int(10 ** rng.uniform(1, 6.5)) if rng.random() < 0.9 else None
+        likes = int(views * rng.uniform(0.005, 0.08)) if views else None
+        videos.append({
+            "video_id": f"bench{i:07d}",
+            "title": " ".join(rng.sample(TITLE_WORDS, rng.randint(3, 7))),
+            "query": rng.choice(TOPICS),
+            "channel": f"Channel {rng.randrange(max(n // 20, 1))}",
+            "published_at": (now - timedelta(hours=rng.uniform(1, 120 * 24))).isoformat() if rng.random() < 0.95 else "",
+            "view_count": views,
+            "like_ratio": likes / views if views else None,
+            "sources": rng.choice(SOURCES),
+            "quality_score": rng.uniform(-3, 6),
+        })
+    return videos
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_size(ranker: Ranker, selector: DiverseSelector, n: int, k: int, repeat: int) -> dict:
+    videos = make_candidates(n)
+    heap = best_of(repeat, lambda: ranker.top_k(videos, k))
+
+    def rank_sort():
+        ctx = ranker.context()  # fresh per run, like top_k
+        return sorted(videos, key=lambda v: ranker.score(v, ctx), reverse=True)[:k]
+
+    full = best_of(repeat, rank_sort)
+    scores = [v["rank_score"] for v in videos]
+    select_heap = best_of(repeat, lambda: heapq.nlargest(k, scores))
+    select_sort = best_of(repeat, lambda: sorted(scores, reverse=True)[:k])
+    select_diverse = best_of(repeat, lambda: selector.select(videos, k))
+    assert [v["video_id"] for v in ranker.top_k(videos, k)] == \
+           [v["video_id"] for v in sorted(videos, key=lambda v: v["rank_score"], reverse=True)[:k]]
+    return {"candidates": n, "k": k, "rank_heap_s": heap, "rank_sort_s": full,
+            "select_heap_s": select_heap, "select_sort_s": select_sort, "select_diverse_s": select_diverse,
+            "diverse_stats": dict(selector.last_stats),
+            "us_per_candidate": heap / n * 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,5000,10000,50000")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    config = load_config()
+    scoring, output = config["scoring"], config.get("output", {})
+    ranker = Ranker(scoring.get("weights", DEFAULT_WEIGHTS), scoring)
+    selector = DiverseSelector(per_channel=output.get("max_submissions_per_channel"),
+                               per_topic=output.get("max_videos_per_search"),
+                               mmr_lambda=output.get("mmr_lambda", 0.7),
+                               max_similarity=output.get("max_title_similarity", 0.8))
+    print(f"features: {', '.join(f'{name}={w:g}' for name, _, w in ranker.active)}")
+    print(f"{'candidates':>10}  {'rank+heap':>10}  {'rank+sort':>10}  {'us/cand':>8}  {'nlargest':>9}  {'sort[:k]':>9}  {'diverse':>9}  {'rescored':>8}")
+    results = []
+    for n in (int(s) for s in args.sizes.split(",")):
+        r = bench_size(ranker, selector, n, args.k, args.repeat)
+        results.append(r)
+        print(f"{n:>10}  {r['rank_heap_s'] * 1e3:8.1f}ms  {r['rank_sort_s'] * 1e3:8.1f}ms  {r['us_per_candidate']:8.2f}  "
+              f"{r['select_heap_s'] * 1e3:7.2f}ms  {r['select_sort_s'] * 1e3:7.2f}ms  "
+              f"{r['select_diverse_s'] * 1e3:7.2f}ms  {r['diverse_stats']['rescored']:8d}", flush=True)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
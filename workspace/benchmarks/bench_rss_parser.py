@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: streaming RSS parser vs the old regex path.
+
+    python3 bench_rss_parser.py [--repeat 2000]
+
+The regex path below is the pre-rss_parser implementation of
+fetch_channel_rss(), kept here as the baseline.
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "youtube_scouter"))
+from rss_parser import collect_rss_entries  # noqa: E402
+
+SKIP_PATTERNS = ["shorts", "#shorts"]
+MAX_VIDEOS = 3
+
+
+def legacy_regex_parse(content: str, limit: int):
+    entries = []
+    for entry in re.findall(r'<entry>(.*?)</entry>', content, re.DOTALL)[:limit]:
+        video_id_match = re.search(r'<yt:videoId>([^<]+)</yt:videoId>', entry)
+        if not video_id_match:
+            continue
+        title = re.search(r'<title>([^<]+)</title>', entry).group(1) if re.search(r'<title>([^<]+)</title>', entry) else "No title"
+        desc_match = re.search(r'<media:description>([^<]+)</media:description>', entry, re.DOTALL)
+        pub_match = re.search(r'<published>([^<]+)</published>', entry)
+        if any(p.lower() in title.lower() for p in SKIP_PATTERNS):
+            continue
+        entries.append({"video_id": video_id_match.group(1), "title": title,
+                        "description": desc_match.group(1)[:500] if desc_match else "",
+                        "published_at": pub_match.group(1) if pub_match else ""})
+    return entries
+
+
+def accept(entry):
+    return not any(p in entry["title"].lower() for p in SKIP_PATTERNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--feed", default=os.path.join(HERE, "fixtures", "youtube_rss.xml"))
+    args = parser.parse_args()
+
+    with open(args.feed, "rb") as f:
+        body = f.read()
+    text = body.decode("utf-8")
+    entry_count = text.count("<entry>")
+
+    cases = [
+        (f"regex, first {MAX_VIDEOS}", lambda: legacy_regex_parse(text, MAX_VIDEOS)),
+        (f"stream, first {MAX_VIDEOS} qualifying", lambda: collect_rss_entries(body, MAX_VIDEOS, accept)),
+        (f"regex, all {entry_count}", lambda: legacy_regex_parse(text, entry_count)),
+        (f"stream, all {entry_count}", lambda: collect_rss_entries(body, entry_count, accept)),
+    ]
+
+    print(f"feed: {os.path.basename(args.feed)} ({len(body)} bytes, {entry_count} entries), repeat={args.repeat}")
+    for name, fn in cases:
+        seconds = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+        print(f"  {name:<32} {seconds * 1e6:9.1f} µs/feed")
+
+    legacy_titles = [e["title"] for e in legacy_regex_parse(text, entry_count)]
+    stream_titles = [e["title"] for e in collect_rss_entries(body, entry_count, accept)]
+    escaped = sum("&amp;" in t or "&#39;" in t for t in legacy_titles)
+    print(f"  titles with undecoded entities: regex={escaped}, "
+          f"stream={sum('&amp;' in t or '&#39;' in t for t in stream_titles)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark: run the scouters against recorded fixtures.
+
+    python3 bench_scouters.py [--targets youtube,github,weather]
+                              [--channels 10,100,1000] [--topics 26,260]
+                              [--latency 0.03] [--json results.json] [--max-wall 420]
+
+Each scenario runs the real script in a child process, in a scratch working
+directory, with OPENCLAW_HTTP_HOST_MAP pointing every host at the local
+stub_server. The child reports wall time, inclusive time per stage (summed
+across threads, so nested or concurrent stages can add up to more than the
+wall time), total time spent in time.sleep, peak traced Python memory and
+max RSS; for youtube the scouter's own metrics spans are included in --json. Exits non-zero if any scenario exceeds --max-wall (the cron job
+timeout), so slowdowns show up here before they show up in cron.
+
+YouTube scales: every --channels value runs with 26 topics, every other
+--topics value runs with the smallest channel count.
+"""
+
+import argparse
+import functools
+import importlib.util
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WORKSPACE = os.path.join(HERE, "..")
+YOUTUBE_DIR = os.path.join(WORKSPACE, "youtube_scouter")
+GITHUB_DIR = os.path.join(WORKSPACE, "github_scouter")
+WEATHER_SCRIPT = os.path.join(WORKSPACE, "..", "workspace-routine-runner", "scripts", "weather-alert.py")
+RESULT_MARKER = "BENCH_RESULT "
+
+sys.path.insert(0, HERE)
+from stub_server import StubState, start_stub_server  # noqa: E402
+
+# Module-level functions timed in each target (stage name -> function name)
+STAGES = {
+    "youtube": {
+        "notion channels": "fetch_channels_from_notion",
+        "channel ids": "update_missing_channel_ids",
+        "rss": "fetch_all_channel_rss",
+        "search api": "search_youtube",
+        "search scrape": "search_youtube_scrape",
+        "dedup": "deduplicate_videos",
+        "enrich": "enrich_videos",
+        "rank": "rank_videos",
+        "log push": "push_log_to_notion",
+    },
+    "github": {
+        "trending": "fetch_github_trending",
+    },
+    "weather": {
+        "nws": "get_nws_alerts",
+        "forecasts": "get_forecasts",
+        "timeline": "check_forecast_timeline",
+        "wttr alerts": "check_wttr_alerts",
+    },
+}
+
+
+# ====== child side ======
+class StageTimer:
+    def __init__(self):
+        self.totals = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+
+    def wrap(self, stage: str, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return timed
+
+    def instrument(self, module, stages: dict):
+        for stage, name in stages.items():
+            if hasattr(module, name):
+                setattr(module, name, self.wrap(stage, getattr(module, name)))
+
+
+def _youtube_workdir(workdir: str, topics: int):
+    import yaml
+    with open(os.path.join(YOUTUBE_DIR, "youtube-scouter-config.yaml")) as f:
+        config = yaml.safe_load(f)
+    base = config["sources"]["search"]["topics"]
+    config["sources"]["search"]["topics"] = [base[i % len(base)] + ("" if i < len(base) else f" {i // len(base)}")
+                                             for i in range(topics)]
+    with open(os.path.join(workdir, "youtube-scouter-config.yaml"), "w") as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+
+
+def run_child(target: str, workdir: str, topics: int) -> dict:
+    timer = StageTimer()
+    real_sleep = time.sleep
+    time.sleep = timer.wrap("sleep", real_sleep)
+    spans = []  # youtube_scouter's own metrics spans
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    if target == "youtube":
+        _youtube_workdir(workdir, topics)
+        os.chdir(workdir)  # the scouter reads its config and state from cwd
+        sys.path[:0] = [YOUTUBE_DIR, WORKSPACE]
+        import youtube_scouter as module
+        timer.instrument(module, STAGES[target])
+        ok = module.run()
+        spans = module.metrics.snapshot()["spans"]
+    elif target == "github":
+        sys.path[:0] = [GITHUB_DIR, WORKSPACE]
+        import github_scouter as module
+        for name in ("REPO_INDEX_PATH", "SNAPSHOT_PATH", "TRENDING_CACHE_PATH"):
+            setattr(module, name, os.path.join(workdir, os.path.basename(getattr(module, name))))
+        timer.instrument(module, STAGES[target])
+        module.main()
+        ok = True
+    elif target == "weather":
+        sys.path.insert(0, os.path.dirname(WEATHER_SCRIPT))
+        spec = importlib.util.spec_from_file_location("weather_alert", WEATHER_SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        for name in ("NWS_CACHE_PATH", "SEEN_ALERTS_PATH", "FORECAST_TIMELINE_PATH", "PENDING_PATH", "LOCK_PATH",
+                     "ALERT_FILE"):
+            setattr(module, name, os.path.join(workdir, os.path.basename(getattr(module, name))))
+        timer.instrument(module, STAGES[target])
+        module.run_once()
+        ok = True
+    else:
+        raise SystemExit(f"unknown target {target}")
+
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return {"ok": bool(ok), "wall": wall, "stages": timer.totals, "calls": timer.calls, "spans": spans,
+            "peak_traced_mb": peak / 2**20,
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+# ====== parent side ======
+def run_scenario(state: StubState, port: int, target: str, channels: int, topics: int) -> dict:
+    state.channels = channels
+    state.reset_counts()
+    workdir = tempfile.mkdtemp(prefix=f"bench-{target}-")
+    env = dict(os.environ,
+               OPENCLAW_HTTP_HOST_MAP=f"*=127.0.0.1:{port}",
+               NOTION_TOKEN="bench-notion-token", YOUTUBE_API_KEY="bench-youtube-key",
+               TRANSCRIPT_API_KEY="bench-transcript-key", GITHUB_TOKEN="bench-github-token",
+               PYTHONUNBUFFERED="1")
+    try:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", target,
+                               "--workdir", workdir, "--topics", str(topics)],
+                              env=env, capture_output=True, text=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+    if result is None:
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-5:]
+        result = {"ok": False, "error": "\n".join(tail)}
+    result.update(target=target, channels=channels, topics=topics, requests=state.reset_counts())
+    return result
+
+
+def format_result(r: dict) -> str:
+    label = f"{r['target']:<8}"
+    if r["target"] == "youtube":
+        label += f" {r['channels']:>5} ch {r['topics']:>4} topics"
+    else:
+        label += " " * 20
+    if "wall" not in r:
+        return f"{label}  FAILED: {r.get('error', '')}"
+    stages = ", ".join(f"{k} {v:.2f}s" for k, v in sorted(r["stages"].items(), key=lambda kv: -kv[1]))
+    return (f"{label}  wall {r['wall']:7.2f}s  peak {r['peak_traced_mb']:6.1f} MB traced / "
+            f"{r['max_rss_mb']:6.1f} MB rss  {sum(r['requests'].values()):5d} req"
+            f"{'' if r['ok'] else '  (run reported failure)'}\n           {stages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--targets", default="youtube,github,weather")
+    parser.add_argument("--channels", default="10,100,1000")
+    parser.add_argument("--topics", default="26,260")
+    parser.add_argument("--latency", type=float, default=0.03, help="stub response delay (simulated RTT)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--max-wall", type=float, default=420, help="fail if any scenario takes longer")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_child(args.child, args.workdir, int(args.topics))
+        print(RESULT_MARKER + json.dumps(result))
+        return 0
+
+    channel_scales = [int(n) for n in args.channels.split(",")]
+    topic_scales = [int(n) for n in args.topics.split(",")]
+    scenarios = []
+    for target in args.targets.split(","):
+        if target == "youtube":
+            scenarios += [(target, ch, topic_scales[0]) for ch in channel_scales]
+            scenarios += [(target, min(channel_scales), t) for t in topic_scales[1:]]
+        else:
+            scenarios.append((target, 0, 0))
+
+    state = StubState(latency=args.latency)
+    server = start_stub_server(state)
+    port = server.server_address[1]
+    results = []
+    try:
+        for target, channels, topics in scenarios:
+            result = run_scenario(state, port, target, channels, topics)
+            print(format_result(result), flush=True)
+            results.append(result)
+    finally:
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+    slow = [r for r in results if r.get("wall", float("inf")) > args.max_wall]
+    if slow:
+        print(f"\n{len(slow)} scenario(s) failed or exceeded {args.max_wall:.0f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
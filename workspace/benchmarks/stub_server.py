@@ -0,0 +1,269 @@
+"""
+Local stand-in for every HTTP service the scouters talk to.
+
+Requests are routed by their Host header, so a script pointed at this server
+with OPENCLAW_HTTP_HOST_MAP="*=127.0.0.1:<port>" runs unmodified. Responses
+are built from the recorded fixtures in fixtures/, scaled up as needed:
+IDs are rewritten per channel / query so dedup and ranking see realistic,
+distinct data.
+
+    python3 stub_server.py --port 8800 --channels 100
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+FIXTURE_CHANNEL_ID = "UCbmNph6atAoGfqLoCL_duAg"
+CHANNEL_DB_ID = "2ff55a34-9949-8001-9654-e5e4461ee6a7"
+
+
+def _read(name: str, mode: str = "r"):
+    with open(os.path.join(FIXTURES, name), mode) as f:
+        return f.read()
+
+
+def channel_id(index: int) -> str:
+    return f"UCbench{index:017d}"
+
+
+def _token(text: str, length: int = 6) -> str:
+    return hashlib.md5(text.encode()).hexdigest()[:length]
+
+
+class StubState:
+    """Scale knobs plus per-host request counters; shared by all handler threads."""
+
+    def __init__(self, channels: int = 10, latency: float = 0.0, repos_per_query: int = 30):
+        self.channels = channels
+        self.latency = latency
+        self.repos_per_query = repos_per_query
+        self.counts = {}
+        self._lock = threading.Lock()
+        self.rss = _read("youtube_rss.xml")
+        self.search = json.loads(_read("youtube_search.json"))
+        self.results_html = _read("youtube_results.html")
+        self.channel_page = json.loads(_read("notion_channel_page.json"))
+        self.github = json.loads(_read("github_search.json"))
+        self.nws = _read("nws_alerts.json")
+        self.wttr = _read("wttr_j1.json")
+        self.started = format_datetime(datetime.now(timezone.utc), usegmt=True)
+
+    def count(self, host: str):
+        with self._lock:
+            self.counts[host] = self.counts.get(host, 0) + 1
+
+    def reset_counts(self):
+        with self._lock:
+            counts, self.counts = self.counts, {}
+        return counts
+
+    # ---- YouTube ----
+    def feed(self, cid: str) -> str:
+        body = self.rss.replace(FIXTURE_CHANNEL_ID, cid).replace(FIXTURE_CHANNEL_ID[2:], cid[2:])
+        body = body.replace("vid0000", "v" + _token(cid))
+        # Keep the entries recent so the max_age_days filter behaves like it does on live feeds
+        now = datetime.now(timezone.utc)
+        counter = iter(range(1000))
+        return re.sub(r"<published>2026-[^<]+</published>",
+                      lambda m: f"<published>{(now - timedelta(days=next(counter) * 2 + 1)).isoformat()}</published>",
+                      body)
+
+    def search_results(self, query: str, kind: str) -> dict:
+        data = json.loads(json.dumps(self.search))
+        if kind == "channel":
+            data["items"] = [{"kind": "youtube#searchResult",
+                              "id": {"kind": "youtube#channel", "channelId": channel_id(int(_token(query), 16) % 10**6)},
+                              "snippet": {"title": query, "channelTitle": query}}]
+            return data
+        prefix = "s" + _token(query)
+        for item in data["items"]:
+            item["id"]["videoId"] = item["id"]["videoId"].replace("srch", prefix[:4]).replace("000", prefix[4:7], 1)
+            item["snippet"]["publishedAt"] = (datetime.now(timezone.utc) - timedelta(days=2)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return data
+
+    def results_page(self, query: str) -> str:
+        return self.results_html.replace("scrp", "r" + _token(query, 3))
+
+    def videos(self, ids) -> dict:
+        return {"kind": "youtube#videoListResponse", "items": [
+            {"kind": "youtube#video", "id": vid,
+             "snippet": {"title": f"Video {vid}", "description": "Chapters:\n00:00 Intro\n" + "Detailed walkthrough. " * 20,
+                         "channelTitle": "Bench Channel", "publishedAt": "2026-10-10T14:00:00Z"},
+             "contentDetails": {"duration": f"PT{4 + int(_token(vid, 2), 16) % 40}M12S"},
+             "statistics": {"viewCount": str(1000 + int(_token(vid, 4), 16)), "likeCount": "100"}}
+            for vid in ids if vid]}
+
+    # ---- Notion ----
+    def channel_pages(self, body: dict) -> dict:
+        cursor = int(body.get("start_cursor") or 0)
+        size = min(int(body.get("page_size") or 100), 100)
+        edited_since = (body.get("filter") or {}).get("last_edited_time", {}).get("on_or_after")
+        template_edited = self.channel_page["last_edited_time"]
+        total = 0 if edited_since and edited_since > template_edited else self.channels
+        results = []
+        for i in range(cursor, min(cursor + size, total)):
+            page = json.loads(json.dumps(self.channel_page))
+            page["id"] = f"2ff55a34-9949-8100-{i // 10**12:04d}-{i % 10**12:012d}"
+            page["properties"]["Channel ID"]["rich_text"][0]["text"]["content"] = channel_id(i)
+            page["properties"]["Name"]["title"][0]["text"]["content"] = f"Bench Channel {i}"
+            results.append(page)
+        more = cursor + size < total
+        return {"object": "list", "results": results, "has_more": more,
+                "next_cursor": str(cursor + size) if more else None, "type": "page_or_database"}
+
+    # ---- GitHub ----
+    def github_search(self, query: dict) -> dict:
+        q = query.get("q", [""])[0]
+        page = int(query.get("page", ["1"])[0])
+        per_page = int(query.get("per_page", ["30"])[0])
+        template = self.github["items"][0]
+        total = self.repos_per_query * 2
+        items = []
+        for n in range((page - 1) * per_page, min(page * per_page, total)):
+            name = f"repo-{_token(q)}-{n}"
+            items.append(dict(template, id=n, name=name, full_name=f"bench-org/{name}",
+                              html_url=f"https://github.com/bench-org/{name}",
+                              stargazers_count=5000 - n * 37))
+        return {"total_count": total, "incomplete_results": False, "items": items}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+    state: StubState = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body=b"", content_type: str = "application/json", headers: dict = None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        elif isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _conditional(self, etag: str, body, content_type: str = "application/json"):
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers={"ETag": etag})
+        else:
+            self._send(200, body, content_type, {"ETag": etag})
+
+    def _route(self, method: str):
+        state = self.state
+        host = (self.headers.get("Host") or "").split(":")[0]
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        path = parts.path
+        state.count(host)
+        if state.latency:
+            time.sleep(state.latency)
+
+        if host == "www.youtube.com" and path == "/feeds/videos.xml":
+            cid = query.get("channel_id", [""])[0]
+            return self._conditional(f'"{cid}"', state.feed(cid), "application/atom+xml; charset=UTF-8")
+        if host == "www.youtube.com" and path == "/results":
+            return self._send(200, state.results_page(query.get("search_query", [""])[0]), "text/html; charset=utf-8")
+        if host == "www.googleapis.com" and path == "/youtube/v3/search":
+            return self._send(200, state.search_results(query.get("q", [""])[0], query.get("type", ["video"])[0]))
+        if host == "www.googleapis.com" and path == "/youtube/v3/videos":
+            return self._send(200, state.videos(query.get("id", [""])[0].split(",")))
+
+        if host == "api.notion.com":
+            body = self._body() if method in ("POST", "PATCH") else {}
+            match = re.match(r"/v1/databases/([^/]+)/query$", path)
+            if match and method == "POST":
+                if match.group(1).replace("-", "") == CHANNEL_DB_ID.replace("-", ""):
+                    return self._send(200, state.channel_pages(body))
+                return self._send(200, {"object": "list", "results": [], "has_more": False, "next_cursor": None})
+            if re.match(r"/v1/data_sources/[^/]+/query$", path) and method == "POST":
+                return self._send(200, {"object": "list", "results": [], "has_more": False, "next_cursor": None})
+            if path == "/v1/pages" and method == "POST":
+                return self._send(200, {"object": "page", "id": str(uuid.uuid4()),
+                                        "properties": body.get("properties", {})})
+            match = re.match(r"/v1/pages/([^/]+)$", path)
+            if match and method == "PATCH":
+                return self._send(200, {"object": "page", "id": match.group(1)})
+
+        if host == "api.github.com" and path == "/search/repositories":
+            data = state.github_search(query)
+            etag = '"' + _token(json.dumps(data, sort_keys=True), 16) + '"'
+            return self._conditional(etag, data)
+        if host == "api.weather.gov" and path == "/alerts/active":
+            if self.headers.get("If-Modified-Since") == state.started:
+                return self._send(304, headers={"Last-Modified": state.started})
+            return self._send(200, state.nws, "application/geo+json", {"Last-Modified": state.started})
+        if host == "wttr.in":
+            return self._send(200, state.wttr)
+        if host == "transcriptapi.com":
+            return self._send(200, {"channel_id": channel_id(int(_token(parts.query), 16) % 10**6)})
+
+        self._send(404, {"object": "error", "status": 404, "code": "object_not_found",
+                         "message": f"stub: no route for {method} {host}{path}"})
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PATCH(self):
+        self._route("PATCH")
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def start_stub_server(state: StubState, port: int = 0) -> StubServer:
+    """Serve in a background thread; the bound port is server.server_address[1]."""
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    server = StubServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+    server = start_stub_server(StubState(args.channels, args.latency), args.port)
+    print(f"Stub server on http://127.0.0.1:{server.server_address[1]} "
+          f"(OPENCLAW_HTTP_HOST_MAP='*=127.0.0.1:{server.server_address[1]}')")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
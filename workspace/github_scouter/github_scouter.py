@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
 """
-GitHub Trending Scouter V2 - 支持全量查重与自动更新 Star 数
+GitHub Trending Scouter V2 - 支持增量查重与自动更新 Star 数
 """
 
 import os
 import sys
-import json
-import time
-import urllib.request
-import urllib.parse
-from datetime import datetime, timedelta
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from openclaw_common.http_client import default_client
+from openclaw_common.notion_writer import NotionWriter
+from repo_index import RepoIndex
+from snapshot_store import SnapshotStore
+from trending_collector import EtagCache, TrendingCollector
 
 # ====== CONFIG (建议使用环境变量或外部 yaml) ======
 NOTION_TOKEN = os.getenv("NOTION_TOKEN") or os.getenv("NOTION_API_KEY")
@@ -17,64 +20,67 @@ GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 DATABASE_ID = "2f855a34-9949-8020-83b5-cc37c2f54df5"  # 知识中心 database_id
 DATA_SOURCE_ID = "2f855a34-9949-806b-888c-000bf8c77d79"  # data_source_id for queries
 CATEGORY = "Github"
+NOTION_WRITE_RATE = 3.0  # Notion 平均限速约 3 req/s
+# Trending 采集: 创建时间窗口 (天) × 语言 (None 表示不限语言), 每组查询最多翻 TRENDING_MAX_PAGES 页。
+# 请求数超过 Search API 每分钟配额 (有 token 30 次, 无 token 10 次) 时, 从列表末尾的语言开始裁掉查询
+TRENDING_WINDOWS = (1, 7, 20, 90)
+TRENDING_LANGUAGES = (None, "Python", "TypeScript", "Rust", "Go")
+TRENDING_PER_PAGE = 30
+TRENDING_MAX_PAGES = 1
+TRENDING_RANK_BY = "stars"  # "stars": Star 总数 (原排序); "velocity": 每天新增 Star 数
+TRENDING_LIMIT = 15  # 每次最多写入 Notion 的项目数
+TRENDING_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "github-scouter-etags.json")
+# URL → page_id 本地索引 (运行时缓存, 删除后会自动重建)
+REPO_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "github-scouter-index.json")
+# 最后写入的快照 + Star 历史 (用于跳过无变化的更新)
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "github-scouter-snapshots.json")
+
+
+def repo_snapshot(repo):
+    """写入 Notion 的字段快照"""
+    return {
+        "title": f"{repo['full_name']} ⭐ {repo['stargazers_count']}",
+        "stars": repo["stargazers_count"],
+        "language": repo.get("language") or "N/A",
+    }
 
 
 class NotionClient:
-    def __init__(self, token):
+    def __init__(self, token, http=None):
         self.token = token
+        self.http = http or default_client()
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Notion-Version": "2025-09-03",  # 使用最新的 API 版本
-            "Content-Type": "application/json",
         }
-
-    def _request(self, url, method="POST", data=None):
-        req = urllib.request.Request(
-            url,
-            data=json.dumps(data).encode() if data else None,
-            headers=self.headers,
-            method=method,
+        # 写操作走共享队列: 令牌桶限速, 429 时按 Retry-After 暂停
+        self.writer = NotionWriter(token, notion_version="2025-09-03", rate=NOTION_WRITE_RATE, http=self.http)
+
+    def _request(self, url, method="POST", data=None, idempotent=None):
+        # 复用连接池; 429/5xx 由 http_client 按 Retry-After 自动重试 (POST 默认只重试 429 和连接失败),
+        # 其余非 2xx 抛出 HttpError
+        resp = self.http.request(
+            method, url, headers=self.headers, json_body=data, timeout=30,
+            idempotent=idempotent, raise_for_status=True
         )
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read().decode())
-
-    def get_all_existing_repos(self):
-        """分页获取数据库中所有 Repo URL 及其对应的 Page ID"""
-        url = f"https://api.notion.com/v1/data_sources/{DATA_SOURCE_ID}/query"
-        existing_map = {}
-        has_more = True
-        next_cursor = None
-
-        print("[INFO] 正在同步 Notion 已有数据...")
-        while has_more:
-            payload = {"page_size": 100}
-            if next_cursor:
-                payload["start_cursor"] = next_cursor
-
-            data = self._request(url, data=payload)
-            for page in data.get("results", []):
-                repo_url = page["properties"].get("URL", {}).get("url")
-                if repo_url:
-                    existing_map[repo_url] = page["id"]
+        return resp.json()
 
-            has_more = data.get("has_more", False)
-            next_cursor = data.get("next_cursor")
-
-        return existing_map
+    def query_data_source(self, body):
+        """对知识中心 data source 执行一次查询 (单页)"""
+        return self._request(f"https://api.notion.com/v1/data_sources/{DATA_SOURCE_ID}/query", data=body, idempotent=True)
 
     def create_page(self, repo, category):
-        """创建新页面"""
-        url = "https://api.notion.com/v1/pages"
-        name = repo["full_name"]
-        stars = repo["stargazers_count"]
+        """创建新页面 (异步, 返回 Future[WriteResult])"""
+        snapshot = repo_snapshot(repo)
+        stars = snapshot["stars"]
         desc = repo.get("description") or "No description"
         link = repo["html_url"]
-        lang = repo.get("language") or "N/A"
+        lang = snapshot["language"]
 
         payload = {
             "parent": {"database_id": DATABASE_ID},
             "properties": {
-                "Goal name": {"title": [{"text": {"content": f"{name} ⭐ {stars}"}}]},
+                "Goal name": {"title": [{"text": {"content": snapshot["title"]}}]},
                 "Category": {"select": {"name": category}},
                 "Insert_date": {"date": {"start": datetime.now().strftime("%Y-%m-%d")}},
                 "URL": {"url": link},
@@ -94,37 +100,40 @@ class NotionClient:
                 },
             ],
         }
-        return self._request(url, method="POST", data=payload)
+        return self.writer.create_page(payload)
 
     def update_page(self, page_id, repo):
-        """更新已存在页面的 Star 数和日期"""
-        url = f"https://api.notion.com/v1/pages/{page_id}"
-        name = repo["full_name"]
-        stars = repo["stargazers_count"]
-
+        """更新已存在页面的 Star 数和日期 (异步, 返回 Future[WriteResult])"""
         payload = {
             "properties": {
-                "Goal name": {"title": [{"text": {"content": f"{name} ⭐ {stars}"}}]},
+                "Goal name": {"title": [{"text": {"content": repo_snapshot(repo)["title"]}}]},
                 "Insert_date": {"date": {"start": datetime.now().strftime("%Y-%m-%d")}},
             }
         }
-        return self._request(url, method="PATCH", data=payload)
+        return self.writer.update_page(page_id, payload)
 
 
 def fetch_github_trending():
-    """获取最近 20 天内创建的、Star 最多的项目"""
-    days_ago = (datetime.now() - timedelta(days=20)).strftime("%Y-%m-%d")
-    query = f"created:>{days_ago}"
-    encoded_query = urllib.parse.quote(query)
-    url = f"https://api.github.com/search/repositories?q={encoded_query}&sort=stars&order=desc&per_page=15"
-
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    if GITHUB_TOKEN:
-        headers["Authorization"] = f"token {GITHUB_TOKEN}"
-
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        return json.loads(resp.read().decode()).get("items", [])
+    """多时间窗口 × 多语言并发抓取, 各窗口轮流按 TRENDING_RANK_BY 取前几名, 共 TRENDING_LIMIT 个"""
+    cache = EtagCache(TRENDING_CACHE_PATH)
+    collector = TrendingCollector(
+        windows=TRENDING_WINDOWS, languages=TRENDING_LANGUAGES, per_page=TRENDING_PER_PAGE,
+        max_pages=TRENDING_MAX_PAGES, token=GITHUB_TOKEN, cache=cache, rank_by=TRENDING_RANK_BY,
+    )
+    repos = collector.collect(limit=TRENDING_LIMIT)
+    cache.evict()
+    cache.save()
+    stats = collector.stats
+    queries = collector.queries()
+    skipped = len(collector.all_queries()) - len(queries)
+    trimmed = f" (超出每分钟 {collector.max_requests} 次配额, 跳过 {skipped} 组)" if skipped else ""
+    print(f"[INFO] GitHub 查询 {len(queries)} 组{trimmed}, 请求 {stats['requests']} 次 "
+          f"(304 未修改 {stats['not_modified']} 次), 速率限制: {collector.rate_limit.summary()}")
+    if collector.rate_limit.waited:
+        print(f"[WARN] 等待速率限制重置共 {collector.rate_limit.waited:.0f}s")
+    for error in collector.errors:
+        print(f"[WARN] 查询失败: {error}")
+    return repos
 
 
 def main():
@@ -135,41 +144,72 @@ def main():
     notion = NotionClient(NOTION_TOKEN)
 
     try:
-        # 1. 获取 Notion 中已有的 URL 映射
-        existing_repos = notion.get_all_existing_repos()
-        print(f"[INFO] 数据库中已记录 {len(existing_repos)} 个项目")
+        # 1. 增量同步本地 URL 索引 (只拉取上次运行后改动过的行)
+        index = RepoIndex(REPO_INDEX_PATH, notion.query_data_source)
+        index.refresh()
+        print(f"[INFO] 本地索引 {len(index)} 个项目, 增量同步改动 {index.stats['changed']} 行")
 
-        # 2. 获取 GitHub 趋势
+        # 2. 获取 GitHub 趋势, 只对候选项目查重
         print("[INFO] 正在抓取 GitHub Trending...")
         repos = fetch_github_trending()
+        existing_repos = index.resolve(repo["html_url"] for repo in repos)
+        print(f"[INFO] 候选 {len(repos)} 个, 已存在 {len(existing_repos)} 个 "
+              f"(索引命中 {index.stats['hits']}, 定向查询 {index.stats['lookups']}, "
+              f"Notion 查询 {index.stats['requests']} 次)")
 
-        # 3. 执行 Upsert
+        # 3. 与上次写入的快照比较, 只对有变化的项目执行 Upsert (全部入队, 由 NotionWriter 限速并发执行)
+        snapshots = SnapshotStore(SNAPSHOT_PATH)
         new_count = 0
         update_count = 0
+        failed_count = 0
+        skipped_count = 0
 
+        pending = []
         for repo in repos:
             repo_url = repo["html_url"]
-            repo_name = repo["full_name"]
-
+            snapshot = repo_snapshot(repo)
+            snapshots.record_stars(repo_url, snapshot["stars"])
             if repo_url in existing_repos:
-                # 更新旧项目
                 page_id = existing_repos[repo_url]
-                notion.update_page(page_id, repo)
-                print(f"🔄 更新项目: {repo_name}")
-                update_count += 1
+                if not snapshots.diff(page_id, snapshot):
+                    skipped_count += 1
+                    continue
+                # 更新旧项目
+                pending.append(("🔄 更新项目", repo, page_id, notion.update_page(page_id, repo)))
             else:
                 # 插入新项目
-                notion.create_page(repo, CATEGORY)
-                print(f"✨ 新增项目: {repo_name}")
+                pending.append(("✨ 新增项目", repo, None, notion.create_page(repo, CATEGORY)))
+
+        for label, repo, page_id, future in pending:
+            result = future.result()
+            if not result.ok:
+                print(f"❌ 写入失败: {repo['full_name']} ({result.error})")
+                failed_count += 1
+                if result.op == "update_page" and result.status in (400, 404):
+                    index.discard(repo["html_url"])  # 页面可能已归档/删除, 下次重新定向查询
+                continue
+            print(f"{label}: {repo['full_name']}")
+            if result.op == "update_page":
+                update_count += 1
+            else:
                 new_count += 1
-
-            # 避免请求过快触发 Notion 速率限制
-            time.sleep(0.3)
-
-        print(f"\n📊 运行结束: 新增 {new_count} 个, 更新 {update_count} 个。")
+                page_id = result.data.get("id")
+                if page_id:
+                    index.add(repo["html_url"], page_id)
+            if page_id:
+                snapshots.record_written(page_id, repo_snapshot(repo))
+        index.save()
+        snapshots.save()
+
+        for line in notion.writer.report():
+            print(f"[INFO] Notion {line}")
+        print(f"\n📊 运行结束: 新增 {new_count} 个, 更新 {update_count} 个, "
+              f"跳过 {skipped_count} 个 (无变化), 失败 {failed_count} 个。")
 
     except Exception as e:
         print(f"[FATAL ERROR] {e}")
+    finally:
+        notion.writer.close()
 
 
 if __name__ == "__main__":
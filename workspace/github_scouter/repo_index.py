@@ -0,0 +1,101 @@
+"""
+本地 Repo URL → Notion page_id 索引
+
+知识中心是与 YouTube scouter 共用的大表, 每次全量分页扫描只为给十几个
+trending 项目查重, 代价随表增长。这里改为:
+- 本地 JSON 索引持久化 URL → page_id;
+- 每次运行按 last_edited_time 增量拉取上次之后改动过的行;
+- 索引未命中的候选 URL 再用 `URL equals` 过滤条件定向查询确认。
+因此启动开销只与改动行数和候选数有关, 与数据库总行数无关。
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable
+
+from openclaw_common.state_file import atomic_write, load_json
+
+PAGE_SIZE = 100
+MAX_OR_FILTERS = 100  # Notion compound filter 单层最多 100 个条件
+
+
+def _page_url(page):
+    return (page.get("properties", {}).get("URL") or {}).get("url")
+
+
+class RepoIndex:
+    def __init__(self, path: str, query: Callable[[dict], dict]):
+        """query(body) 执行一次 data_sources/{id}/query 并返回解析后的 JSON"""
+        self.path = path
+        self.query = query
+        self._state = self._load()
+        self.stats = {"requests": 0, "changed": 0, "hits": 0, "lookups": 0}
+
+    def _load(self):
+        state = load_json(self.path, {})
+        if isinstance(state.get("urls"), dict):
+            return state
+        return {"urls": {}, "cursor": None}  # 索引丢失: 由定向查询重新建立
+
+    def save(self):
+        atomic_write(self.path, json.dumps(self._state, ensure_ascii=False))
+
+    def _query_all(self, body):
+        results, cursor = [], None
+        while True:
+            page_body = dict(body, page_size=PAGE_SIZE)
+            if cursor:
+                page_body["start_cursor"] = cursor
+            data = self.query(page_body)
+            self.stats["requests"] += 1
+            results.extend(data.get("results", []))
+            if not data.get("has_more") or not data.get("next_cursor"):
+                return results
+            cursor = data["next_cursor"]
+
+    def refresh(self):
+        """增量同步: 只拉取 last_edited_time 不早于游标的行 (Notion 时间精度为分钟, 边界分钟会重复拉取)"""
+        cursor = self._state["cursor"]
+        if not cursor:
+            # 首次运行不做全量扫描, 已有页面由 resolve() 定向查询补齐
+            self._state["cursor"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:00.000Z")
+            return
+        pages = self._query_all({
+            "filter": {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": cursor}},
+            "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}],
+        })
+        for page in pages:
+            url = _page_url(page)
+            if url:
+                if self._state["urls"].get(url) != page["id"]:
+                    self.stats["changed"] += 1
+                self._state["urls"][url] = page["id"]
+            edited = page.get("last_edited_time")
+            if edited and edited > self._state["cursor"]:
+                self._state["cursor"] = edited
+
+    def resolve(self, urls: Iterable[str]) -> Dict[str, str]:
+        """返回候选 URL 中已存在于 Notion 的 {url: page_id}; 索引未命中的用 URL 过滤条件定向查询"""
+        urls = list(dict.fromkeys(urls))
+        known = self._state["urls"]
+        misses = [u for u in urls if u not in known]
+        self.stats["hits"] += len(urls) - len(misses)
+        self.stats["lookups"] += len(misses)
+        for i in range(0, len(misses), MAX_OR_FILTERS):
+            chunk = misses[i:i + MAX_OR_FILTERS]
+            conditions = [{"property": "URL", "url": {"equals": u}} for u in chunk]
+            body = {"filter": conditions[0] if len(conditions) == 1 else {"or": conditions}}
+            for page in self._query_all(body):
+                url = _page_url(page)
+                if url in chunk:
+                    known[url] = page["id"]
+        return {u: known[u] for u in urls if u in known}
+
+    def add(self, url: str, page_id: str):
+        self._state["urls"][url] = page_id
+
+    def discard(self, url: str):
+        self._state["urls"].pop(url, None)
+
+    def __len__(self):
+        return len(self._state["urls"])
@@ -0,0 +1,56 @@
+"""
+已写入 Notion 的项目快照 + Star 历史
+
+每个 page_id 记录最后一次成功写入的标题 / Star 数 / 语言, 写入前先与之比较,
+没有变化的项目不再发送 PATCH。每个 repo 另外按天记录一条 Star 数时间序列,
+供之后的趋势评分使用 (同一天多次运行只保留最新值)。
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from openclaw_common.state_file import atomic_write, load_json
+
+SNAPSHOT_FIELDS = ("title", "stars", "language")
+
+
+class SnapshotStore:
+    def __init__(self, path: str, max_history: int = 365):
+        self.path = path
+        self.max_history = max_history
+        self._state = self._load()
+
+    def _load(self):
+        state = load_json(self.path, {})
+        if isinstance(state.get("pages"), dict) and isinstance(state.get("stars"), dict):
+            return state
+        return {"pages": {}, "stars": {}}
+
+    def save(self):
+        atomic_write(self.path, json.dumps(self._state, ensure_ascii=False))
+
+    # ---- 变更检测 ----
+    def diff(self, page_id: str, snapshot: Dict) -> Dict[str, Tuple]:
+        """返回 {字段: (旧值, 新值)}; 没有快照的页面视为全部字段都有变化"""
+        previous = self._state["pages"].get(page_id, {})
+        return {k: (previous.get(k), snapshot.get(k)) for k in SNAPSHOT_FIELDS
+                if k not in previous or previous[k] != snapshot.get(k)}
+
+    def record_written(self, page_id: str, snapshot: Dict):
+        record = {k: snapshot.get(k) for k in SNAPSHOT_FIELDS}
+        record["written_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._state["pages"][page_id] = record
+
+    # ---- Star 历史 ----
+    def record_stars(self, repo_url: str, stars: int, date: str = None):
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        series = self._state["stars"].setdefault(repo_url, [])
+        if series and series[-1][0] == date:
+            series[-1][1] = stars
+        else:
+            series.append([date, stars])
+        del series[:-self.max_history]
+
+    def star_history(self, repo_url: str) -> List[Tuple[str, int]]:
+        return [tuple(point) for point in self._state["stars"].get(repo_url, [])]
@@ -0,0 +1,238 @@
+"""
+GitHub Trending 采集器: 多时间窗口 × 多语言, 分页抓取
+
+- 每个 (窗口, 语言) 组合是一条 search/repositories 查询, 各查询通过 FetchPool 并发执行,
+  查询内部按 page 顺序翻页 (结果不足一页即停止);
+- 请求总数不超过 max_requests (Search API 每分钟的配额: 认证 30 次, 未认证 10 次),
+  超出时按优先级 (先不限语言, 再按语言顺序) 裁掉靠后的查询, 一次运行不必等待配额重置;
+- ETag 缓存按 (窗口, 语言, 页码) 记录, 不含查询里每天变化的日期, 所以跨天运行也会带上
+  If-None-Match; 304 时直接复用缓存结果;
+- 共享的 RateLimitTracker 记录 X-RateLimit-Remaining / Reset, 配额用尽时等待到重置时间
+  (超过 max_wait 则放弃剩余页面), 而不是撞上 403; 等待时间计入 summary();
+- 结果在各时间窗口之间轮流选取, 1 天 / 7 天窗口的新项目与 90 天窗口的老项目都能入选。
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from openclaw_common.fetch_pool import FetchPool
+from openclaw_common.http_client import HttpClient, HttpError, default_client
+from openclaw_common.state_file import atomic_write, load_json
+
+SEARCH_URL = "https://api.github.com/search/repositories"
+MAX_SEARCH_RESULTS = 1000  # Search API 最多返回前 1000 条
+SEARCH_RATE_LIMIT = {True: 30, False: 10}  # 每分钟请求数: 有 token / 无 token
+
+
+class RateLimitExhausted(Exception):
+    pass
+
+
+class RateLimitTracker:
+    """按 X-RateLimit-* 响应头调度请求 (Search API: 认证 30 次/分钟, 未认证 10 次/分钟)"""
+
+    def __init__(self, reserve: int = 0, max_wait: float = 65):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.remaining: Optional[int] = None
+        self.limit: Optional[int] = None
+        self.reset_at = 0.0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """请求前调用: 配额不足时等待到重置时间; 需要等待太久则抛出 RateLimitExhausted"""
+        while True:
+            with self._lock:
+                now = time.time()
+                if self.remaining is None or self.remaining > self.reserve or now >= self.reset_at:
+                    if self.remaining is not None and now < self.reset_at:
+                        self.remaining -= 1  # 先占用, 避免并发线程同时用掉最后一次配额
+                    return
+                wait = self.reset_at - now + 1
+                if wait > self.max_wait:
+                    raise RateLimitExhausted(f"rate limit exhausted, resets in {wait:.0f}s")
+                self.waited += wait
+            time.sleep(wait)
+
+    def update(self, response):
+        remaining = response.header("x-ratelimit-remaining")
+        reset = response.header("x-ratelimit-reset")
+        limit = response.header("x-ratelimit-limit")
+        with self._lock:
+            try:
+                if remaining is not None:
+                    self.remaining = int(remaining)
+                if reset is not None:
+                    self.reset_at = float(reset)
+                if limit is not None:
+                    self.limit = int(limit)
+            except ValueError:
+                pass
+
+    def summary(self) -> str:
+        reset_in = max(0, self.reset_at - time.time())
+        return f"剩余 {self.remaining}/{self.limit}, {reset_in:.0f}s 后重置, 累计等待 {self.waited:.0f}s"
+
+
+class EtagCache:
+    """请求 URL+参数 → (ETag, items) 的本地缓存"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._records = load_json(path, {})
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._records.get(key)
+
+    def put(self, key: str, etag: str, data: dict):
+        with self._lock:
+            self._records[key] = {"etag": etag, "data": data, "stored_at": time.time()}
+
+    def evict(self, max_age_days: float = 7):
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            self._records = {k: v for k, v in self._records.items() if v.get("stored_at", 0) >= cutoff}
+
+    def save(self):
+        with self._lock:
+            atomic_write(self.path, json.dumps(self._records, ensure_ascii=False))
+
+
+class TrendingCollector:
+    def __init__(self, windows: Iterable[int] = (1, 7, 20, 90), languages: Iterable[Optional[str]] = (None,),
+                 per_page: int = 30, max_pages: int = 1, token: str = None, cache: EtagCache = None,
+                 rate_limit: RateLimitTracker = None, http: HttpClient = None, max_workers: int = 4,
+                 max_requests: int = None, rank_by: str = "stars"):
+        if rank_by not in RANKINGS:
+            raise ValueError(f"unknown rank_by {rank_by!r}, expected one of {', '.join(RANKINGS)}")
+        self.windows = list(windows)
+        self.languages = list(languages)
+        self.per_page = per_page
+        self.max_pages = max_pages
+        self.max_requests = SEARCH_RATE_LIMIT[bool(token)] if max_requests is None else max_requests
+        self.rank_by = rank_by
+        self.cache = cache
+        self.rate_limit = rate_limit or RateLimitTracker()
+        self.http = http or default_client()
+        self.pool = FetchPool(max_workers=max_workers, per_host_limit=max_workers)
+        self.headers = {"Accept": "application/vnd.github.v3+json"}
+        if token:
+            self.headers["Authorization"] = f"token {token}"
+        self.stats = {"requests": 0, "not_modified": 0, "pages": 0}
+        self.errors: List[str] = []
+        self._stats_lock = threading.Lock()
+
+    def all_queries(self) -> List[Tuple[int, Optional[str]]]:
+        """按优先级排列: 先是不限语言 (languages 的顺序) 的各窗口, 再是下一种语言"""
+        return [(days, lang) for lang in self.languages for days in self.windows]
+
+    def queries(self) -> List[Tuple[int, Optional[str]]]:
+        """实际执行的查询: 最坏情况 (每条都翻满 max_pages 页) 也不超过 max_requests 次请求"""
+        return self.all_queries()[:max(1, self.max_requests // max(1, self.max_pages))]
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _fetch_page(self, key: str, params: Dict) -> dict:
+        cached = self.cache.get(key) if self.cache else None
+        headers = dict(self.headers)
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        self.rate_limit.acquire()
+        resp = self.http.get(SEARCH_URL, params=params, headers=headers, timeout=30)
+        self._count("requests")
+        self.rate_limit.update(resp)
+        if resp.status == 304 and cached:
+            self._count("not_modified")
+            return cached["data"]
+        resp.raise_for_status()
+        data = resp.json()
+        data = {"total_count": data.get("total_count", 0), "items": data.get("items", [])}
+        etag = resp.header("etag")
+        if self.cache and etag:
+            self.cache.put(key, etag, data)
+        return data
+
+    def _collect_query(self, query: Tuple[int, Optional[str]]) -> List[dict]:
+        days, lang = query
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        q = f"created:>{since}" + (f" language:{lang}" if lang else "")
+        items = []
+        for page in range(1, self.max_pages + 1):
+            if page * self.per_page > MAX_SEARCH_RESULTS:
+                break
+            params = {"q": q, "sort": "stars", "order": "desc", "per_page": self.per_page, "page": page}
+            key = f"{days}d|{lang or '*'}|{self.per_page}x{page}"  # 不含日期, 跨天复用 ETag
+            try:
+                data = self._fetch_page(key, params)
+            except (RateLimitExhausted, HttpError):
+                if not items:
+                    raise
+                break  # 已获取的页面仍然有效
+            self._count("pages")
+            items.extend(data["items"])
+            if len(data["items"]) < self.per_page or len(items) >= data["total_count"]:
+                break
+        return items
+
+    def collect(self, limit: int = None) -> List[dict]:
+        """所有查询结果按 html_url 去重, 按 rank_by 降序排列 (stars: Star 总数; velocity: 每天新增 Star 数)。
+
+        指定 limit 时在各时间窗口之间轮流取各自排名最高的项目, 短窗口的新项目不会被
+        长窗口里 Star 更多的老项目挤出前 limit 名。
+        """
+        results = self.pool.map(self._collect_query, self.queries(), host_of=lambda _: "api.github.com")
+        repos: Dict[str, dict] = {}
+        errors = []
+        for result in results:
+            if not result.ok:
+                errors.append(f"{result.item}: {result.error}")
+                continue
+            days, _ = result.item
+            for repo in result.value:
+                url = repo["html_url"]
+                if url not in repos:
+                    repos[url] = dict(repo, windows=[])
+                if days not in repos[url]["windows"]:
+                    repos[url]["windows"].append(days)
+        self.errors = errors
+        if errors and not repos:
+            raise HttpError("; ".join(errors))
+        ranked = sorted(repos.values(), key=RANKINGS[self.rank_by], reverse=True)
+        if not limit:
+            return ranked
+        queues = [deque(r for r in ranked if days in r["windows"]) for days in self.windows]
+        picked: Dict[str, dict] = {}
+        while len(picked) < limit and any(queues):
+            for queue in queues:
+                while queue and queue[0]["html_url"] in picked:
+                    queue.popleft()
+                if queue and len(picked) < limit:
+                    repo = queue.popleft()
+                    picked[repo["html_url"]] = repo
+        return list(picked.values())
+
+
+def star_velocity(repo: dict) -> float:
+    created = repo.get("created_at") or ""
+    try:
+        created_at = datetime.strptime(created[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - created_at).total_seconds() / 86400
+    except ValueError:
+        age = 1.0
+    return repo.get("stargazers_count", 0) / max(age, 1.0)
+
+
+RANKINGS = {
+    "stars": lambda repo: repo.get("stargazers_count", 0),
+    "velocity": star_velocity,
+}
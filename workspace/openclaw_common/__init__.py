@@ -0,0 +1,6 @@
+"""
+Shared helpers for the OpenClaw workspace scripts (scouters, routine runners).
+
+Scripts live in sibling directories and are run directly by cron, so they add
+the workspace directory to ``sys.path`` before importing from this package.
+"""
@@ -0,0 +1,66 @@
+"""
+Bounded-concurrency fetch stage.
+
+Runs one callable per item on a thread pool, limits how many calls hit the
+same host at once, and returns the results in input order together with the
+time each call took.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+
+class FetchResult(NamedTuple):
+    item: Any
+    value: Any
+    error: Optional[BaseException]
+    elapsed: float  # seconds spent in fn, excluding time queued for the host slot
+    host: str
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def host_of_url(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class FetchPool:
+    """Thread pool with a global worker cap and a per-host concurrency cap."""
+
+    def __init__(self, max_workers: int = 8, per_host_limit: int = 4):
+        self.max_workers = max(1, int(max_workers))
+        self.per_host_limit = max(1, int(per_host_limit))
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.Semaphore(self.per_host_limit)
+            return slot
+
+    def _run_one(self, fn: Callable, item: Any, host: str) -> FetchResult:
+        with self._slot(host):
+            start = time.monotonic()
+            try:
+                value, error = fn(item), None
+            except Exception as e:
+                value, error = None, e
+            return FetchResult(item, value, error, time.monotonic() - start, host)
+
+    def map(self, fn: Callable, items: Iterable, host_of: Callable[[Any], str] = None) -> List[FetchResult]:
+        """Run fn(item) for every item; results keep the order of items."""
+        items = list(items)
+        if not items:
+            return []
+        host_of = host_of or (lambda _item: "")
+        workers = min(self.max_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._run_one, fn, item, host_of(item)) for item in items]
+            return [f.result() for f in futures]
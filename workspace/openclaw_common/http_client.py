@@ -0,0 +1,343 @@
+"""
+Pooled HTTP client shared by the workspace scripts.
+
+Built on http.client so the scripts keep running on a bare python3. Each
+(scheme, host, port) gets its own pool of keep-alive connections, so repeated
+calls to googleapis / youtube.com / api.notion.com / transcriptapi.com reuse
+one TLS session instead of paying a fork/exec + handshake per request.
+
+Connections are checked out by one thread at a time, so a single client can
+be shared by FetchPool workers.
+
+OPENCLAW_HTTP_HOST_MAP ("api.notion.com=127.0.0.1:8800,*=127.0.0.1:8800")
+sends requests for the listed hosts to a plain-HTTP stand-in server instead,
+keeping the original Host header; the benchmarks use it to replay fixtures.
+"""
+
+import gzip
+import http.client
+import json
+import os
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlsplit
+
+DEFAULT_USER_AGENT = "OpenClaw/1.0"
+DEFAULT_TIMEOUT = 15
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+NON_IDEMPOTENT_RETRY_STATUSES = (429,)  # the server refused before doing anything
+NON_IDEMPOTENT_METHODS = ("POST",)
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+MAX_RETRY_AFTER = 60  # never sleep longer than this on a Retry-After header
+HOST_MAP_ENV = "OPENCLAW_HTTP_HOST_MAP"
+
+
+class HttpError(Exception):
+    """Transport failure, or a non-2xx status when raise_for_status is set."""
+
+    def __init__(self, message: str, response: "Response" = None):
+        super().__init__(message)
+        self.response = response
+
+    @property
+    def status(self) -> Optional[int]:
+        return self.response.status if self.response is not None else None
+
+
+class ConnectError(HttpError):
+    """The connection could not be opened, so the request was never sent."""
+
+
+class Response:
+    def __init__(self, url: str, status: int, reason: str, headers: Dict[str, str], body: bytes,
+                 elapsed: float, attempts: int):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers  # lower-cased names
+        self.body = body
+        self.elapsed = elapsed
+        self.attempts = attempts
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self._charset(), errors="replace")
+
+    def _charset(self) -> str:
+        content_type = self.headers.get("content-type", "")
+        for part in content_type.split(";")[1:]:
+            key, _, value = part.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf-8"
+
+    def json(self):
+        return json.loads(self.body.decode(self._charset())) if self.body else {}
+
+    def header(self, name: str, default: str = None) -> Optional[str]:
+        return self.headers.get(name.lower(), default)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HttpError(f"HTTP {self.status} {self.reason} for {self.url}", self)
+        return self
+
+    def __repr__(self):
+        return f"<Response {self.status} {self.url}>"
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_host_map(value: str) -> Dict[str, Tuple[str, int]]:
+    """'host=addr:port,...' -> {host: (addr, port)}; '*' matches every host."""
+    host_map = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        host, _, target = item.partition("=")
+        addr, _, port = target.rpartition(":")
+        if not host or not addr or not port.isdigit():
+            raise ValueError(f"Bad {HOST_MAP_ENV} entry: {item!r}")
+        host_map[host.strip().lower()] = (addr, int(port))
+    return host_map
+
+
+def _decode_body(body: bytes, encoding: str) -> bytes:
+    encoding = (encoding or "").lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+class _HostPool:
+    """Idle keep-alive connections for one (scheme, host, port)."""
+
+    def __init__(self, scheme: str, host: str, port: Optional[int], max_idle: int):
+        self.scheme, self.host, self.port = scheme, host, port
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float):
+        """Return (connection, reused)."""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=timeout), False
+
+    def release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class HttpClient:
+    """Keep-alive HTTP client with per-host pools, timeouts and retries.
+
+    Transient failures (connection errors, timeouts, 429 and 5xx) are retried
+    with exponential backoff; a Retry-After header overrides the backoff.
+    Other statuses are returned to the caller, or raised as HttpError when
+    raise_for_status=True.
+
+    A POST may already have been processed when it fails after being sent, so
+    by default it is only retried when the connection could not be opened or
+    on a 429. Read-only POSTs (search/query endpoints) pass idempotent=True.
+    """
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = 2, backoff: float = 1.0, max_idle_per_host: int = 8,
+                 host_map: Dict[str, Tuple[str, int]] = None):
+        self.user_agent = user_agent
+        self.host_map = parse_host_map(os.environ.get(HOST_MAP_ENV, "")) if host_map is None else host_map
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_idle_per_host = max_idle_per_host
+        self._pools = {}
+        self._lock = threading.Lock()
+        # Running totals for run metrics; bytes are as sent/received on the wire (before decompression)
+        self.counters = {"requests": 0, "bytes_sent": 0, "bytes_received": 0, "retries": 0, "errors": 0}
+
+    def _pool(self, scheme: str, host: str, port: Optional[int]) -> _HostPool:
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = _HostPool(scheme, host, port, self.max_idle_per_host)
+            return pool
+
+    def _count(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                self.counters[key] += value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def _send_once(self, method: str, url: str, headers: Dict[str, str], body: Optional[bytes], timeout: float):
+        """Send one request over a pooled connection; returns (status, reason, headers, body)."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise HttpError(f"Unsupported URL scheme: {url}")
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        target = self.host_map.get(parts.hostname) or self.host_map.get("*") if self.host_map else None
+        if target:
+            headers = dict(headers, Host=parts.netloc)
+            pool = self._pool("http", *target)
+        else:
+            pool = self._pool(parts.scheme, parts.hostname, parts.port)
+
+        while True:
+            conn, reused = pool.acquire(timeout)
+            if conn.sock is None:
+                try:
+                    conn.connect()  # separately, so a failure here is known to be safe to retry
+                except OSError as e:
+                    conn.close()
+                    raise ConnectError(f"connect to {parts.netloc} failed: {e}") from e
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if reused:
+                    continue  # server dropped an idle keep-alive connection; retry on a fresh one
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            self._count(requests=1, bytes_sent=len(body or b""), bytes_received=len(raw))
+            if resp.will_close:
+                conn.close()
+            else:
+                pool.release(conn)
+            return resp.status, resp.reason, resp_headers, _decode_body(raw, resp_headers.get("content-encoding"))
+
+    def request(self, method: str, url: str, *, params: dict = None, headers: dict = None,
+                json_body=None, data: bytes = None, timeout: float = None, retries: int = None,
+                idempotent: bool = None, follow_redirects: bool = True, raise_for_status: bool = False) -> Response:
+        if params:
+            url += ("&" if urlsplit(url).query else "?") + urlencode(params)
+        send_headers = {"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"}
+        if headers:
+            send_headers.update(headers)
+        body = data
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            send_headers.setdefault("Content-Type", "application/json")
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        if idempotent is None:
+            idempotent = method.upper() not in NON_IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else NON_IDEMPOTENT_RETRY_STATUSES
+
+        start = time.monotonic()
+        attempt = redirects = 0
+        while True:
+            try:
+                status, reason, resp_headers, resp_body = self._send_once(method, url, send_headers, body, timeout)
+            except (ConnectError, OSError, http.client.HTTPException, zlib.error) as e:
+                if attempt < retries and (idempotent or isinstance(e, ConnectError)):
+                    self._count(retries=1)
+                    time.sleep(self.backoff * (2 ** attempt))
+                    attempt += 1
+                    continue
+                self._count(errors=1)
+                error_cls = ConnectError if isinstance(e, ConnectError) else HttpError
+                raise error_cls(f"{method} {url} failed after {attempt + 1} attempt(s): {e}") from e
+
+            if follow_redirects and status in REDIRECT_STATUSES and "location" in resp_headers:
+                if redirects >= MAX_REDIRECTS:
+                    raise HttpError(f"Too many redirects for {url}")
+                redirects += 1
+                target = urljoin(url, resp_headers["location"])
+                if urlsplit(target).netloc.lower() != urlsplit(url).netloc.lower():
+                    # never hand credentials to another host
+                    send_headers = {k: v for k, v in send_headers.items() if k.lower() != "authorization"}
+                url = target
+                if status == 303 or (status in (301, 302) and method == "POST"):
+                    method, body = "GET", None
+                continue
+
+            if status in retry_statuses and attempt < retries:
+                delay = retry_after_seconds(resp_headers.get("retry-after"))
+                if delay is None:
+                    delay = self.backoff * (2 ** attempt)
+                self._count(retries=1)
+                time.sleep(min(delay, MAX_RETRY_AFTER))
+                attempt += 1
+                continue
+
+            response = Response(url, status, reason, resp_headers, resp_body, time.monotonic() - start, attempt + 1)
+            if raise_for_status:
+                response.raise_for_status()
+            return response
+
+    def get(self, url: str, **kwargs) -> Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> Response:
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> Response:
+        return self.request("PATCH", url, **kwargs)
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client() -> HttpClient:
+    """Process-wide client, so every module in a run shares the same pools."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
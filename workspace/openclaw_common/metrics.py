@@ -0,0 +1,132 @@
+"""
+Per-stage run metrics.
+
+A RunMetrics holds named counter sources (callables returning a running
+total: HTTP requests, bytes, retries, quota units, ...). Each span records
+its wall time plus how much every source moved while it was open, so the
+stages of a run can be compared without threading counters through every
+function. Stages are expected to run one after another; work done by pool
+threads during a span is attributed to that span.
+
+Results are written as JSON, and optionally in the Prometheus text
+exposition format for a node_exporter textfile collector.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from .state_file import atomic_write
+
+
+class RunMetrics:
+    def __init__(self, name: str, sources: Dict[str, Callable[[], float]] = None):
+        self.name = name
+        self.sources = dict(sources or {})
+        self.spans: List[dict] = []
+        self.started_at = time.time()
+        self._start = time.monotonic()
+        self._stack = threading.local()
+        self._lock = threading.Lock()
+        self.extra: Dict[str, float] = {}
+
+    def _sample(self) -> Dict[str, float]:
+        values = {}
+        for key, source in self.sources.items():
+            try:
+                values[key] = source()
+            except Exception:
+                values[key] = 0  # a broken source must not break the run
+        return values
+
+    @contextmanager
+    def span(self, stage: str, **attrs):
+        """Time a stage; yields the span dict so callers can attach counts (e.g. span["videos"] = n)."""
+        stack = getattr(self._stack, "names", None)
+        if stack is None:
+            stack = self._stack.names = []
+        record = {"stage": stage, "parent": stack[-1] if stack else None, **attrs}
+        before = self._sample()
+        start = time.monotonic()
+        stack.append(stage)
+        ok = False
+        try:
+            yield record
+            ok = True
+        finally:
+            stack.pop()
+            record["duration"] = time.monotonic() - start
+            record["ok"] = ok
+            after = self._sample()
+            for key in self.sources:
+                record[key] = after[key] - before[key]
+            with self._lock:
+                self.spans.append(record)
+
+    def set(self, key: str, value: float):
+        """Run-level value (e.g. videos submitted)."""
+        self.extra[key] = value
+
+    def snapshot(self, success: Optional[bool] = None) -> dict:
+        with self._lock:
+            spans = list(self.spans)
+        return {"name": self.name, "started_at": self.started_at, "duration": time.monotonic() - self._start,
+                "success": success, "totals": self._sample(), "values": dict(self.extra), "spans": spans}
+
+    # ---- output ----
+    def write_json(self, path: str, success: Optional[bool] = None):
+        atomic_write(path, json.dumps(self.snapshot(success), indent=1, ensure_ascii=False))
+
+    def prometheus_text(self, success: Optional[bool] = None) -> str:
+        snap = self.snapshot(success)
+        prefix = self.name
+        lines = []
+
+        def metric(name, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}")
+
+        # Repeated stages (e.g. one span per retry) are summed
+        per_stage: Dict[str, Dict[str, float]] = {}
+        for span in snap["spans"]:
+            totals = per_stage.setdefault(span["stage"], {"duration": 0.0, "count": 0})
+            totals["duration"] += span["duration"]
+            totals["count"] += 1
+            for key in self.sources:
+                totals[key] = totals.get(key, 0) + span.get(key, 0)
+
+        metric("stage_duration_seconds", "Wall time spent in each stage of the last run",
+               [({"stage": s}, round(t["duration"], 6)) for s, t in per_stage.items()])
+        for key in self.sources:
+            metric(f"stage_{key}", f"{key} during each stage of the last run",
+                   [({"stage": s}, t.get(key, 0)) for s, t in per_stage.items()])
+        metric("run_duration_seconds", "Wall time of the last run", [({}, round(snap["duration"], 6))])
+        if success is not None:
+            metric("run_success", "1 if the last run succeeded", [({}, int(bool(success)))])
+        metric("last_run_timestamp_seconds", "Start time of the last run", [({}, round(snap["started_at"], 3))])
+        for key, value in snap["values"].items():
+            metric(key, key.replace("_", " "), [({}, value)])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, success: Optional[bool] = None):
+        atomic_write(path, self.prometheus_text(success))
+
+    def summary_lines(self) -> List[str]:
+        """One log line per top-level span."""
+        lines = []
+        for span in self.spans:
+            if span["parent"] is not None:
+                continue
+            counters = ", ".join(f"{k} {span[k]:g}" for k in self.sources if span.get(k))
+            lines.append(f"{span['stage']}: {span['duration']:.2f}s" + (f" ({counters})" if counters else ""))
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
@@ -0,0 +1,188 @@
+"""
+Queued Notion page writer shared by the scouters.
+
+Page creates/updates are submitted as futures and executed by a small worker
+pool. A token bucket keeps the request rate at Notion's documented average of
+~3 requests/second, and a 429 pauses the whole bucket for the Retry-After
+interval instead of letting every worker hammer the API. Per-operation
+throughput and latency are collected for the run log.
+
+Page creates are not idempotent: a create that timed out or got a 5xx may
+still have made the page, so creates are only retried on 429/409 or when the
+connection could not be opened. Updates only set properties and get the full
+retry set.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+from .http_client import (NON_IDEMPOTENT_METHODS, ConnectError, HttpClient, HttpError, default_client,
+                          retry_after_seconds)
+
+NOTION_API = "https://api.notion.com/v1"
+RETRY_STATUSES = (409, 429, 500, 502, 503, 504)  # 409: Notion's conflict_error, safe to retry
+CREATE_RETRY_STATUSES = (409, 429)  # rejected before anything was written
+
+
+class TokenBucket:
+    """Blocking token bucket; pause() holds every caller back (used for Retry-After)."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class WriteResult(NamedTuple):
+    op: str
+    ok: bool
+    status: Optional[int]
+    data: dict
+    error: Optional[str]
+    latency: float  # submit -> done, including queueing and retries
+    attempts: int
+
+
+class _OpStats:
+    def __init__(self):
+        self.ok = self.failed = self.retries = 0
+        self.latencies = []
+        self.first_start = self.last_end = None
+
+
+class NotionWriter:
+    def __init__(self, token: str, notion_version: str = "2022-06-28", rate: float = 3.0,
+                 workers: int = 3, max_retries: int = 4, http: HttpClient = None):
+        self.token = token
+        self.notion_version = notion_version
+        self.max_retries = max_retries
+        self.http = http or default_client()
+        self.bucket = TokenBucket(rate)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="notion-writer")
+        self._stats: Dict[str, _OpStats] = {}
+        self._lock = threading.Lock()
+
+    # ---- submission ----
+    def submit(self, op: str, method: str, url: str, payload: dict, notion_version: str = None) -> Future:
+        submitted = time.monotonic()
+        return self._executor.submit(self._execute, op, method, url, payload,
+                                     notion_version or self.notion_version, submitted)
+
+    def create_page(self, payload: dict, notion_version: str = None) -> Future:
+        return self.submit("create_page", "POST", f"{NOTION_API}/pages", payload, notion_version)
+
+    def update_page(self, page_id: str, payload: dict, notion_version: str = None) -> Future:
+        return self.submit("update_page", "PATCH", f"{NOTION_API}/pages/{page_id}", payload, notion_version)
+
+    def close(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- execution ----
+    def _execute(self, op, method, url, payload, notion_version, submitted) -> WriteResult:
+        headers = {"Authorization": f"Bearer {self.token}", "Notion-Version": notion_version}
+        status, data, error = None, {}, None
+        attempt = 0
+        idempotent = method.upper() not in NON_IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else CREATE_RETRY_STATUSES
+        with self._lock:
+            stats = self._stats.setdefault(op, _OpStats())
+            if stats.first_start is None:
+                stats.first_start = submitted
+        for attempt in range(1, self.max_retries + 2):
+            self.bucket.acquire()
+            try:
+                # Retries are handled here so a 429 can pause the shared bucket
+                resp = self.http.request(method, url, headers=headers, json_body=payload, timeout=30, retries=0)
+            except HttpError as e:
+                status, data, error = None, {}, str(e)
+                if attempt <= self.max_retries and (idempotent or isinstance(e, ConnectError)):
+                    time.sleep(min(2 ** (attempt - 1), 30))
+                    continue
+                break
+            status = resp.status
+            try:
+                data = resp.json()
+            except ValueError:
+                data = {}
+            if resp.ok:
+                error = None
+                break
+            error = data.get("message") or f"HTTP {status}"
+            if status in retry_statuses and attempt <= self.max_retries:
+                delay = retry_after_seconds(resp.header("retry-after"))
+                if status == 429:
+                    self.bucket.pause(delay if delay is not None else 1.0)
+                else:
+                    time.sleep(delay if delay is not None else min(2 ** (attempt - 1), 30))
+                continue
+            break
+
+        done = time.monotonic()
+        result = WriteResult(op, error is None, status, data, error, done - submitted, attempt)
+        with self._lock:
+            stats.retries += attempt - 1
+            stats.latencies.append(result.latency)
+            stats.last_end = done
+            if result.ok:
+                stats.ok += 1
+            else:
+                stats.failed += 1
+        return result
+
+    # ---- reporting ----
+    def reset_stats(self):
+        """Start a new reporting window (a long-lived writer is reused across passes)."""
+        with self._lock:
+            self._stats = {}
+
+    @property
+    def retries(self) -> int:
+        with self._lock:
+            return sum(s.retries for s in self._stats.values())
+
+    def report(self) -> List[str]:
+        """One line per operation: counts, retries, throughput and latency."""
+        lines = []
+        with self._lock:
+            for op, s in sorted(self._stats.items()):
+                total = s.ok + s.failed
+                if not total:
+                    continue
+                lat = sorted(s.latencies)
+                window = max((s.last_end or 0) - (s.first_start or 0), 1e-9)
+                p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+                lines.append(f"{op}: {s.ok}/{total} ok, {s.retries} retries, {total / window:.2f} ops/s, "
+                             f"latency avg {sum(lat) / len(lat):.2f}s p50 {lat[len(lat) // 2]:.2f}s "
+                             f"p95 {p95:.2f}s max {lat[-1]:.2f}s")
+        return lines
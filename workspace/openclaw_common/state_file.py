@@ -0,0 +1,41 @@
+"""
+Local state files (caches, indexes, mirrors) shared by the workspace scripts.
+
+atomic_write() writes to a temp file in the target directory and renames it
+over the target, so a crash mid-write never leaves a truncated file behind.
+load_json() reads a missing, unreadable or malformed file as the default:
+everything kept in these files can be rebuilt, it only costs extra requests.
+"""
+
+import json
+import os
+import tempfile
+
+
+def atomic_write(path: str, data):
+    """Replace path with data (str or bytes) via temp file + rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        if isinstance(data, bytes):
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_json(path: str, default=None):
+    """Decoded JSON at path; default if the file is missing, broken or not of default's type."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return default
+    if default is not None and not isinstance(data, type(default)):
+        return default
+    return data
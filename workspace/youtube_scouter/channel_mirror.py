@@ -0,0 +1,104 @@
+"""
+Local mirror of the Notion channel database.
+
+The first sync (and every full_resync_hours after it) pages through the whole
+database with start_cursor. Runs in between ask Notion only for rows whose
+last_edited_time is at or after the newest one already mirrored, so a normal
+startup costs one small query no matter how many channels there are.
+
+Notion's last_edited_time only has minute precision, so the boundary minute is
+re-fetched every time (upserts are idempotent). Archived or deleted rows are
+not returned by an incremental query; they drop out of the mirror at the next
+full resync.
+"""
+
+import json
+import time
+from typing import Callable, Dict, List
+
+from openclaw_common.state_file import atomic_write, load_json
+
+PAGE_SIZE = 100
+
+
+class NotionQueryError(Exception):
+    pass
+
+
+class ChannelMirror:
+    def __init__(self, path: str, query: Callable[[dict], dict], full_resync_hours: float = 168):
+        """query(body) POSTs one databases/{id}/query request and returns the decoded response."""
+        self.path = path
+        self.query = query
+        self.full_resync = full_resync_hours * 3600
+        self._state = self._load()
+        self.last_sync = {"mode": None, "requests": 0, "changed": 0}
+
+    # ---- persistence ----
+    def _load(self) -> dict:
+        state = load_json(self.path, {})
+        if isinstance(state.get("pages"), dict):
+            return state
+        return {"pages": {}, "cursor": None, "full_synced_at": 0}
+
+    def save(self):
+        atomic_write(self.path, json.dumps(self._state, ensure_ascii=False))
+
+    # ---- sync ----
+    def needs_full_sync(self) -> bool:
+        return (not self._state["cursor"]
+                or time.time() - self._state.get("full_synced_at", 0) > self.full_resync)
+
+    def _query_all(self, body: dict) -> List[dict]:
+        results, cursor = [], None
+        while True:
+            page_body = dict(body, page_size=PAGE_SIZE)
+            if cursor:
+                page_body["start_cursor"] = cursor
+            data = self.query(page_body)
+            self.last_sync["requests"] += 1
+            if data.get("object") == "error" or "results" not in data:
+                raise NotionQueryError(data.get("code") or data.get("message") or data.get("error") or "unknown error")
+            results.extend(data["results"])
+            if not data.get("has_more") or not data.get("next_cursor"):
+                return results
+            cursor = data["next_cursor"]
+
+    def sync(self, full: bool = None) -> Dict:
+        """Bring the mirror up to date; raises NotionQueryError and leaves the mirror untouched on failure."""
+        full = self.needs_full_sync() if full is None else full
+        self.last_sync = {"mode": "full" if full else "incremental", "requests": 0, "changed": 0}
+        body = {"sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}]}
+        if not full:
+            body["filter"] = {"timestamp": "last_edited_time",
+                              "last_edited_time": {"on_or_after": self._state["cursor"]}}
+        results = self._query_all(body)
+
+        pages = {} if full else dict(self._state["pages"])
+        cursor = None if full else self._state["cursor"]
+        for page in results:
+            page_id = page.get("id")
+            if not page_id:
+                continue
+            if page.get("archived") or page.get("in_trash"):
+                pages.pop(page_id, None)
+                continue
+            edited = page.get("last_edited_time", "")
+            previous = self._state["pages"].get(page_id)
+            if previous is None or previous.get("last_edited_time") != edited:
+                self.last_sync["changed"] += 1
+            pages[page_id] = {"id": page_id, "last_edited_time": edited, "properties": page.get("properties", {})}
+            if edited and (cursor is None or edited > cursor):
+                cursor = edited
+
+        self._state["pages"] = pages
+        self._state["cursor"] = cursor
+        if full:
+            self._state["full_synced_at"] = time.time()
+        return self.last_sync
+
+    def pages(self) -> List[dict]:
+        return list(self._state["pages"].values())
+
+    def __len__(self) -> int:
+        return len(self._state["pages"])
@@ -0,0 +1,130 @@
+"""
+Channel ID resolution for Notion rows that have no Channel ID yet.
+
+A row is resolved from its Homepage (TranscriptAPI) and, failing that, by
+looking its name up on YouTube (Data API search, then the results page) and
+resolving the channel URL that turns up. Every outcome is remembered per
+homepage and per name: hits are reused without any request, misses are only
+retried after an exponential backoff (6h, 12h, 24h, ... capped at 7 days)
+instead of paying the whole lookup chain again on every run.
+
+ChannelResolver.resolve() is safe to call from several threads at once.
+"""
+
+import json
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+from openclaw_common.state_file import atomic_write, load_json
+
+
+class Resolution(NamedTuple):
+    channel_id: str = ""
+    channel_url: str = ""  # found by the name search; "" when the homepage was enough
+    source: str = ""       # "homepage" or "search"
+    cached: bool = False
+    deferred: bool = False  # every lookup is still backing off from an earlier miss
+
+
+def homepage_key(homepage: str) -> str:
+    return "homepage:" + homepage.strip().rstrip("/")
+
+
+def name_key(name: str) -> str:
+    return "name:" + " ".join(name.lower().split())
+
+
+class ResolverCache:
+    def __init__(self, path: str, base_backoff_hours: float = 6, max_backoff_days: float = 7):
+        self.path = path
+        self.base_backoff = base_backoff_hours * 3600
+        self.max_backoff = max_backoff_days * 86400
+        self._lock = threading.Lock()
+        self._records = self._load()
+        self.hits = self.deferred = self.lookups = 0
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.deferred = self.lookups = 0
+
+    def _load(self) -> dict:
+        return load_json(self.path, {})
+
+    def save(self):
+        with self._lock:
+            atomic_write(self.path, json.dumps(self._records, ensure_ascii=False))
+
+    def lookup(self, key: str, now: float = None) -> Optional[dict]:
+        """The cached record, or None when the key is unknown or a failed lookup is due for a retry."""
+        now = time.time() if now is None else now
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                return None
+            if record.get("channel_id"):
+                self.hits += 1
+                return record
+            if now >= record.get("retry_at", 0):
+                return None
+            self.deferred += 1
+            return record
+
+    def record_hit(self, key: str, channel_id: str, channel_url: str = ""):
+        with self._lock:
+            self.lookups += 1
+            self._records[key] = {"channel_id": channel_id, "channel_url": channel_url, "checked_at": time.time()}
+
+    def record_miss(self, key: str, channel_url: str = ""):
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            failures = self._records.get(key, {}).get("failures", 0) + 1
+            backoff = min(self.base_backoff * 2 ** (failures - 1), self.max_backoff)
+            self._records[key] = {"channel_id": "", "channel_url": channel_url, "checked_at": now,
+                                  "failures": failures, "retry_at": now + backoff}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class ChannelResolver:
+    def __init__(self, cache: ResolverCache, resolve_url: Callable[[str], str],
+                 find_channel_url: Callable[[str], str]):
+        """resolve_url(url) -> channel ID or ""; find_channel_url(name) -> channel URL or ""."""
+        self.cache = cache
+        self.resolve_url = resolve_url
+        self.find_channel_url = find_channel_url
+
+    def resolve(self, name: str, homepage: str) -> Resolution:
+        deferred = 0
+        if homepage:
+            key = homepage_key(homepage)
+            record = self.cache.lookup(key)
+            if record is None:
+                channel_id = self.resolve_url(homepage)
+                if channel_id:
+                    self.cache.record_hit(key, channel_id)
+                    return Resolution(channel_id, source="homepage")
+                self.cache.record_miss(key)
+            elif record["channel_id"]:
+                return Resolution(record["channel_id"], source="homepage", cached=True)
+            else:
+                deferred += 1
+
+        if name:
+            key = name_key(name)
+            record = self.cache.lookup(key)
+            if record is None:
+                channel_url = self.find_channel_url(name)
+                channel_id = self.resolve_url(channel_url) if channel_url else ""
+                if channel_id:
+                    self.cache.record_hit(key, channel_id, channel_url)
+                else:
+                    self.cache.record_miss(key, channel_url)
+                return Resolution(channel_id, channel_url, "search")
+            if record["channel_id"]:
+                return Resolution(record["channel_id"], record.get("channel_url", ""), "search", cached=True)
+            deferred += 1
+
+        return Resolution(deferred=deferred > 0 and deferred == bool(homepage) + bool(name))
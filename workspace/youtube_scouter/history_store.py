@@ -0,0 +1,234 @@
+"""
+Recommendation history backends.
+
+A history record looks like
+    {"video_id", "title", "url", "recommended_date", "topic"}
+
+Two backends share the HistoryStore interface:
+- JsonlHistoryStore: append-only JSON Lines file (diff/backup friendly).
+  Appends are a single write + fsync; indexes are built on first lookup.
+  Like the SQLite primary key, the first record of a video_id wins: repeats
+  are skipped on append and ignored on load.
+- SqliteHistoryStore: indexed table, for when the history gets large.
+
+Unreadable history raises HistoryError instead of silently reading as empty,
+since an empty history would re-submit every video ever recommended.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+FIELDS = ("video_id", "title", "url", "recommended_date", "topic")
+
+
+class HistoryError(Exception):
+    pass
+
+
+class HistoryStore(ABC):
+    @abstractmethod
+    def append(self, records: Iterable[Dict]):
+        ...
+
+    @abstractmethod
+    def video_ids(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def get(self, video_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def by_date(self, date: str) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def by_topic(self, topic: str) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def close(self):
+        pass
+
+
+class JsonlHistoryStore(HistoryStore):
+    def __init__(self, path: str):
+        self.path = path
+        self._records = None
+        self._by_id = self._by_date = self._by_topic = None
+        self._lock = threading.Lock()
+
+    def _index(self, record: Dict):
+        if record["video_id"] in self._by_id:
+            return
+        self._records.append(record)
+        self._by_id[record["video_id"]] = record
+        self._by_date[record.get("recommended_date", "")].append(record)
+        self._by_topic[record.get("topic", "")].append(record)
+
+    def _ensure_loaded(self):
+        if self._records is not None:
+            return
+        self._records, self._by_id = [], {}
+        self._by_date, self._by_topic = defaultdict(list), defaultdict(list)
+        self._tail = b''  # trailing bytes after the last newline
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                lines = f.read().split(b'\n')
+        except OSError as e:
+            raise HistoryError(f"Cannot read history {self.path}: {e}") from e
+        self._tail = lines[-1]
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                self._index(json.loads(line))
+            except ValueError as e:
+                # Only a final line without its newline can be torn by a crash mid-append
+                if lineno == len(lines):
+                    break
+                raise HistoryError(f"Corrupt history {self.path} line {lineno}: {e}") from e
+            if lineno == len(lines):
+                self._tail = b''  # complete record, just missing its newline
+
+    def append(self, records: Iterable[Dict]):
+        records = [{k: r.get(k, "") for k in FIELDS} for r in records]
+        with self._lock:
+            self._ensure_loaded()
+            batch = {}
+            for r in records:
+                if r["video_id"] not in self._by_id:
+                    batch.setdefault(r["video_id"], r)
+            records = list(batch.values())
+            if not records:
+                return
+            data = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records).encode('utf-8')
+            with open(self.path, 'ab') as f:
+                if self._tail:
+                    f.truncate(f.tell() - len(self._tail))  # drop a torn record left by a crash
+                    self._tail = b''
+                elif f.tell() > 0 and not self._ends_with_newline():
+                    data = b'\n' + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            for r in records:
+                self._index(r)
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def video_ids(self) -> List[str]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._by_id)
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_id.get(video_id)
+
+    def by_date(self, date: str) -> List[Dict]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._by_date.get(date, []))
+
+    def by_topic(self, topic: str) -> List[Dict]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._by_topic.get(topic, []))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._records)
+
+
+class SqliteHistoryStore(HistoryStore):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS history (video_id TEXT PRIMARY KEY, title TEXT, url TEXT, "
+                    "recommended_date TEXT, topic TEXT)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS history_date ON history (recommended_date)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS history_topic ON history (topic)")
+        except sqlite3.DatabaseError as e:
+            raise HistoryError(f"Cannot open history {path}: {e}") from e
+
+    def _query(self, sql: str, args=()) -> List[Dict]:
+        with self._lock:
+            try:
+                return [dict(row) for row in self._conn.execute(sql, args)]
+            except sqlite3.DatabaseError as e:
+                raise HistoryError(f"History query failed on {self.path}: {e}") from e
+
+    def append(self, records: Iterable[Dict]):
+        rows = [tuple(r.get(k, "") for k in FIELDS) for r in records]
+        with self._lock, self._conn:  # one transaction per batch
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO history ({', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def video_ids(self) -> List[str]:
+        return [r["video_id"] for r in self._query("SELECT video_id FROM history")]
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM history WHERE video_id = ?", (video_id,))
+        return rows[0] if rows else None
+
+    def by_date(self, date: str) -> List[Dict]:
+        return self._query("SELECT * FROM history WHERE recommended_date = ? ORDER BY rowid", (date,))
+
+    def by_topic(self, topic: str) -> List[Dict]:
+        return self._query("SELECT * FROM history WHERE topic = ? ORDER BY rowid", (topic,))
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) AS n FROM history")[0]["n"]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+BACKENDS = {"jsonl": JsonlHistoryStore, "sqlite": SqliteHistoryStore}
+
+
+def migrate_json_history(json_path: str, store: HistoryStore) -> int:
+    """One-shot import of the legacy {"recommended_videos": [...]} file into an empty store.
+
+    The legacy file is left in place; it is only read while the store is empty.
+    """
+    if not os.path.exists(json_path) or len(store) > 0:
+        return 0
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            records = json.load(f).get("recommended_videos", [])
+    except (OSError, ValueError, AttributeError) as e:
+        raise HistoryError(f"Cannot migrate legacy history {json_path}: {e}") from e
+    store.append(records)
+    return len(records)
+
+
+def open_history_store(path: str, backend: str = "jsonl", legacy_json_path: str = None) -> HistoryStore:
+    if backend not in BACKENDS:
+        raise HistoryError(f"Unknown history backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    store = BACKENDS[backend](path)
+    if legacy_json_path:
+        migrate_json_history(legacy_json_path, store)
+    return store
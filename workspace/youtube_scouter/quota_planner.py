@@ -0,0 +1,116 @@
+"""
+YouTube Data API quota budget and topic planner.
+
+The Data API gives 10,000 units per day, reset at midnight Pacific time;
+every search.list call costs 100 units whether it succeeds or not. Usage is
+persisted so several runs on the same day share one budget, and topics are
+ordered by how many new videos they yielded recently, so the calls we can
+afford go to the most productive topics and the rest go straight to the
+scrape path.
+"""
+
+import json
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+from openclaw_common.state_file import atomic_write, load_json
+
+SEARCH_COST = 100
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+YIELD_DECAY = 0.5  # weight of the newest run in a topic's yield average
+
+
+class QuotaBudget:
+    def __init__(self, path: str, daily_limit: int = 10000, reserve_units: int = 0):
+        self.path = path
+        self.daily_limit = daily_limit
+        self.reserve_units = reserve_units
+        self._lock = threading.Lock()
+        self._state = self._load()
+        self._roll_day()
+
+    # ---- persistence ----
+    def _load(self) -> dict:
+        # Unknown usage starts the day over rather than blocking all API calls
+        return load_json(self.path, {})
+
+    def save(self):
+        with self._lock:
+            atomic_write(self.path, json.dumps(self._state, ensure_ascii=False, indent=1))
+
+    @staticmethod
+    def quota_day() -> str:
+        return datetime.now(QUOTA_TZ).strftime("%Y-%m-%d")
+
+    def _roll_day(self):
+        day = self.quota_day()
+        if self._state.get("date") != day:
+            self._state.update({"date": day, "used": 0, "calls": 0, "exhausted": False})
+        self._state.setdefault("topics", {})
+
+    # ---- budget ----
+    @property
+    def used(self) -> int:
+        return self._state["used"]
+
+    @property
+    def available(self) -> int:
+        """Units that may still be spent today without touching the reserve."""
+        with self._lock:
+            self._roll_day()
+            if self._state["exhausted"]:
+                return 0
+            return max(0, self.daily_limit - self.reserve_units - self._state["used"])
+
+    def can_spend(self, units: int = SEARCH_COST) -> bool:
+        return self.available >= units
+
+    def try_charge(self, units: int = SEARCH_COST) -> bool:
+        """Reserve units for one call; False if that would dip into the reserve."""
+        with self._lock:
+            self._roll_day()
+            if self._state["exhausted"] or self._state["used"] + units > self.daily_limit - self.reserve_units:
+                return False
+            self._state["used"] += units
+            self._state["calls"] += 1
+            return True
+
+    def mark_exhausted(self):
+        """The API reported quotaExceeded: stop using it until the Pacific-time reset."""
+        with self._lock:
+            self._state["exhausted"] = True
+
+    # ---- topic planning ----
+    def record_yield(self, topic: str, new_videos: int):
+        with self._lock:
+            stats = self._state["topics"].setdefault(topic, {"yield": float(new_videos), "runs": 0})
+            if stats["runs"]:
+                stats["yield"] = YIELD_DECAY * new_videos + (1 - YIELD_DECAY) * stats["yield"]
+            stats["runs"] += 1
+            stats["last_run"] = self._state["date"]
+
+    def topic_yield(self, topic: str) -> float:
+        stats = self._state["topics"].get(topic)
+        if stats is None:
+            # Untried topics rank above every known one so they get measured
+            return float("inf")
+        return stats["yield"]
+
+    def plan(self, topics: List[str], cost: int = SEARCH_COST) -> Tuple[List[str], List[str]]:
+        """Split topics into (api_topics, scrape_topics), best recent yield first.
+
+        Each list keeps the config order among topics of equal yield.
+        """
+        affordable = self.available // cost if cost else len(topics)
+        ranked = sorted(range(len(topics)), key=lambda i: -self.topic_yield(topics[i]))
+        chosen = set(ranked[:affordable])
+        api = [t for i, t in enumerate(topics) if i in chosen]
+        api.sort(key=lambda t: -self.topic_yield(t))
+        scrape = [t for i, t in enumerate(topics) if i not in chosen]
+        return api, scrape
+
+    def summary(self) -> Dict[str, int]:
+        return {"date": self._state["date"], "used": self._state["used"], "calls": self._state["calls"],
+                "available": self.available, "exhausted": self._state["exhausted"]}
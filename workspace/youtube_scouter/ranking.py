@@ -0,0 +1,141 @@
+"""
+Ranking of a run's candidate videos.
+
+A video's rank_score is a weighted sum of features. Each feature is a small
+function (video, context) -> float registered in FEATURES; the weights come
+from `scoring.weights` in the config, so a feature is switched off by giving
+it weight 0 and a new one only needs a function plus a weight.
+
+Built-in features (all roughly on a 0..1 or small-integer scale):
+- keywords:      quality_score (title/description term hits). The run-wide
+                 source/failure offsets in it are the same for every video.
+- recency:       0.5 ** (age_days / recency_half_life_days); 0.5 if unknown
+- views_per_day: log10(1 + views / age_days), from videos.list or the page
+- like_ratio:    likes / views, saturating at like_ratio_cap
+- channel_prior: `scoring.channel_priors[channel name]`, default 0
+- source:        best of rss_bonus / search_penalty / scrape_penalty over the
+                 sources the video was found by
+
+Only the top k are submitted, so selection is heapq.nlargest: O(n log k)
+comparisons over one pass instead of sorting every candidate.
+"""
+
+import heapq
+import math
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+RECENCY_UNKNOWN = 0.5
+DEFAULT_WEIGHTS = {"keywords": 1.0}  # the old quality_score order
+
+FeatureFn = Callable[[Dict, "RankContext"], float]
+FEATURES: Dict[str, FeatureFn] = {}
+
+
+def feature(name: str):
+    """Register a feature extractor under the name used in `scoring.weights`."""
+    def register(fn: FeatureFn) -> FeatureFn:
+        FEATURES[name] = fn
+        return fn
+    return register
+
+
+def parse_published(value: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        published = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+
+class RankContext:
+    def __init__(self, scoring: Dict, now: datetime = None):
+        self.now = now or datetime.now(timezone.utc)
+        self.half_life_days = scoring.get('recency_half_life_days', 7)
+        self.like_ratio_cap = scoring.get('like_ratio_cap', 0.05)
+        self.channel_priors = {str(k).lower(): v for k, v in (scoring.get('channel_priors') or {}).items()}
+        self.source_bonus = {"rss": scoring.get('rss_bonus', 0.0), "search": scoring.get('search_penalty', 0.0),
+                             "scrape": scoring.get('scrape_penalty', 0.0)}
+        self._ages: Dict[str, Optional[float]] = {}  # published_at -> age, shared by the features
+
+    def age_days(self, video: Dict) -> Optional[float]:
+        value = video.get("published_at", "")
+        if value not in self._ages:
+            published = parse_published(value)
+            self._ages[value] = None if published is None else max((self.now - published).total_seconds() / 86400, 0.0)
+        return self._ages[value]
+
+
+@feature("keywords")
+def keywords(video: Dict, ctx: RankContext) -> float:
+    return video.get("quality_score", 0.0)
+
+
+@feature("recency")
+def recency(video: Dict, ctx: RankContext) -> float:
+    age = ctx.age_days(video)
+    return RECENCY_UNKNOWN if age is None else 0.5 ** (age / ctx.half_life_days)
+
+
+@feature("views_per_day")
+def views_per_day(video: Dict, ctx: RankContext) -> float:
+    views = video.get("view_count")
+    if not views:
+        return 0.0
+    age = ctx.age_days(video)
+    return math.log10(1 + views / max(age if age is not None else 1.0, 1.0))
+
+
+@feature("like_ratio")
+def like_ratio(video: Dict, ctx: RankContext) -> float:
+    ratio = video.get("like_ratio")
+    return min(ratio / ctx.like_ratio_cap, 1.0) if ratio else 0.0
+
+
+@feature("channel_prior")
+def channel_prior(video: Dict, ctx: RankContext) -> float:
+    return ctx.channel_priors.get(video.get("channel", "").lower(), 0.0)
+
+
+@feature("source")
+def source(video: Dict, ctx: RankContext) -> float:
+    sources = video.get("sources") or [video.get("source", "")]
+    return max(ctx.source_bonus.get(s, 0.0) for s in sources)
+
+
+class Ranker:
+    def __init__(self, weights: Dict[str, float], scoring: Dict = None, features: Dict[str, FeatureFn] = None):
+        features = FEATURES if features is None else features
+        unknown = sorted(set(weights) - set(features))
+        if unknown:
+            raise ValueError(f"unknown ranking features in scoring.weights: {', '.join(unknown)}")
+        self.scoring = scoring or {}
+        self.active = [(name, features[name], float(w)) for name, w in weights.items() if w]
+
+    def context(self, now: datetime = None) -> RankContext:
+        return RankContext(self.scoring, now)
+
+    def score(self, video: Dict, ctx: RankContext) -> float:
+        """Set and return video["rank_score"]."""
+        score = sum(weight * fn(video, ctx) for _, fn, weight in self.active)
+        video["rank_score"] = score
+        return score
+
+    def score_all(self, videos: Iterable[Dict], now: datetime = None):
+        ctx = self.context(now)
+        for video in videos:
+            self.score(video, ctx)
+
+    def explain(self, video: Dict, ctx: RankContext = None) -> Dict[str, float]:
+        """Weighted contribution of each feature (for logs)."""
+        ctx = ctx or self.context()
+        return {name: weight * fn(video, ctx) for name, fn, weight in self.active}
+
+    def top_k(self, videos: Iterable[Dict], k: int = None, now: datetime = None) -> List[Dict]:
+        """Highest rank_score first; ties keep input order. k=None ranks everything."""
+        ctx = self.context(now)
+        if k is None:
+            return sorted(videos, key=lambda v: self.score(v, ctx), reverse=True)
+        return heapq.nlargest(k, videos, key=lambda v: self.score(v, ctx))
@@ -0,0 +1,101 @@
+"""
+On-disk cache for YouTube RSS feeds.
+
+Keyed by channel_id. Each record keeps the validators from the last 200
+response (ETag / Last-Modified) plus the entries parsed from it, so a 304
+reply can be served without downloading or parsing the feed again.
+
+Eviction: records not validated for max_age_days are dropped, then the
+least recently validated records are dropped until at most max_entries remain.
+"""
+
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+from openclaw_common.state_file import atomic_write, load_json
+
+
+class RssCache:
+    def __init__(self, path: str, max_age_days: float = 14, max_entries: int = 2000):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.max_entries = max_entries
+        self._records = None  # loaded on first use
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def _load(self) -> Dict[str, dict]:
+        if self._records is None:
+            self._records = load_json(self.path, {}).get("channels", {})
+        return self._records
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def conditional_headers(self, channel_id: str) -> Dict[str, str]:
+        with self._lock:
+            record = self._load().get(channel_id)
+        headers = {}
+        if record:
+            if record.get("etag"):
+                headers["If-None-Match"] = record["etag"]
+            if record.get("last_modified"):
+                headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def not_modified(self, channel_id: str) -> Optional[List[dict]]:
+        """Handle a 304: refresh the record's validation time and return its cached entries."""
+        with self._lock:
+            record = self._load().get(channel_id)
+            if record is None:
+                self.misses += 1
+                return None
+            record["checked_at"] = time.time()
+            self._dirty = True
+            self.hits += 1
+            return record["entries"]
+
+    def store(self, channel_id: str, etag: Optional[str], last_modified: Optional[str], entries: List[dict]):
+        with self._lock:
+            self.misses += 1
+            if not etag and not last_modified:
+                # Nothing to revalidate with, so the entries would never be reused
+                self._dirty |= self._load().pop(channel_id, None) is not None
+                return
+            self._load()[channel_id] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "checked_at": time.time(),
+                "entries": entries,
+            }
+            self._dirty = True
+
+    def evict(self, now: float = None) -> int:
+        now = time.time() if now is None else now
+        with self._lock:
+            records = self._load()
+            stale = [cid for cid, r in records.items() if now - r.get("checked_at", 0) > self.max_age]
+            for cid in stale:
+                del records[cid]
+            overflow = len(records) - self.max_entries
+            if overflow > 0:
+                oldest = sorted(records, key=lambda cid: records[cid].get("checked_at", 0))[:overflow]
+                for cid in oldest:
+                    del records[cid]
+                stale.extend(oldest)
+            if stale:
+                self._dirty = True
+            return len(stale)
+
+    def save(self):
+        """Evict, then write atomically (temp file + rename)."""
+        self.evict()
+        with self._lock:
+            if not self._dirty:
+                return
+            atomic_write(self.path, json.dumps({"channels": self._records}, ensure_ascii=False))
+            self._dirty = False
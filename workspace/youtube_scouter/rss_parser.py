@@ -0,0 +1,70 @@
+"""
+Incremental parser for YouTube channel RSS (Atom) feeds.
+
+Feeds are pushed through ElementTree's XMLPullParser in chunks and entries
+are yielded as soon as their closing tag is seen, so callers can stop once
+they have enough. XML entities (&amp;, &#39;, ...) are decoded by the parser.
+"""
+
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterable, Iterator, List, Union
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+YT = "{http://www.youtube.com/xml/schemas/2015}"
+MEDIA = "{http://search.yahoo.com/mrss/}"
+
+CHUNK_SIZE = 4 * 1024
+
+Source = Union[bytes, str, Iterable[bytes]]
+
+
+def _chunks(source: Source) -> Iterator[bytes]:
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    if isinstance(source, (bytes, bytearray)):
+        for i in range(0, len(source), CHUNK_SIZE):
+            yield source[i:i + CHUNK_SIZE]
+    else:
+        yield from source
+
+
+def _entry_dict(elem: ET.Element, description_limit: int) -> Dict:
+    return {
+        "video_id": (elem.findtext(f"{YT}videoId") or "").strip(),
+        "title": elem.findtext(f"{ATOM}title") or "No title",
+        "description": (elem.findtext(f"{MEDIA}group/{MEDIA}description") or "")[:description_limit],
+        "published_at": elem.findtext(f"{ATOM}published") or "",
+    }
+
+
+def iter_rss_entries(source: Source, description_limit: int = 500) -> Iterator[Dict]:
+    """Yield one dict per <entry> (video_id, title, description, published_at).
+
+    Raises xml.etree.ElementTree.ParseError on malformed input; entries
+    completed before the error have already been yielded.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    for chunk in _chunks(source):
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if elem.tag != f"{ATOM}entry":
+                continue
+            entry = _entry_dict(elem, description_limit)
+            elem.clear()  # keep memory flat on long feeds
+            if entry["video_id"]:
+                yield entry
+    parser.close()
+
+
+def collect_rss_entries(source: Source, limit: int, accept: Callable[[Dict], bool] = None,
+                        description_limit: int = 500) -> List[Dict]:
+    """Return the first `limit` entries that pass `accept`, without parsing the rest."""
+    entries = []
+    if limit <= 0:
+        return entries
+    for entry in iter_rss_entries(source, description_limit):
+        if accept is None or accept(entry):
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+    return entries
@@ -0,0 +1,128 @@
+"""
+Keyword scoring for video titles.
+
+All `quality_terms` lists (and `filtering.skip_patterns`) are compiled once
+into an Aho-Corasick automaton, so a title is scanned a single time no matter
+how many terms the config holds. Matching keeps the old semantics: a term
+counts once if it occurs anywhere in the lower-cased title, and overlapping
+terms ("course" / "full course") each count.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List
+
+CATEGORIES = ("high_value_terms", "medium_terms", "low_effort_terms", "duration_terms")
+
+
+class TermMatcher:
+    """Aho-Corasick automaton over lower-cased terms grouped by category."""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.categories = list(categories)
+        self.terms = []          # term id -> term
+        self.term_categories = []  # term id -> tuple of category names
+        index = {}
+        for category, terms in categories.items():
+            for term in terms or ():
+                term = str(term).lower()
+                if not term:
+                    continue
+                if term not in index:
+                    index[term] = len(self.terms)
+                    self.terms.append(term)
+                    self.term_categories.append(())
+                tid = index[term]
+                if category not in self.term_categories[tid]:
+                    self.term_categories[tid] += (category,)
+        self._build()
+
+    def _build(self):
+        goto = [{}]
+        out = [()]
+        for tid, term in enumerate(self.terms):
+            state = 0
+            for ch in term:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = goto[state][ch] = len(goto)
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] += (tid,)
+
+        # BFS over the trie computes failure links, then folds them into a full
+        # transition table so scanning never has to walk back up the fail chain
+        fail = [0] * len(goto)
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+        self._delta, self._out = delta, out
+
+    def matched_terms(self, text: str) -> set:
+        """Ids of every term occurring in text (case-insensitive)."""
+        delta, out = self._delta, self._out
+        found = set()
+        state = 0
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Number of distinct terms of each category found in text, in one pass."""
+        counts = dict.fromkeys(self.categories, 0)
+        for tid in self.matched_terms(text):
+            for category in self.term_categories[tid]:
+                counts[category] += 1
+        return counts
+
+    def any(self, text: str) -> bool:
+        delta, out = self._delta, self._out
+        state = 0
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                return True
+        return False
+
+
+class QualityScorer:
+    """Title/description score from the `quality_terms` and `scoring` config sections.
+
+    Source bonuses and run-level failure penalties are added by the caller.
+    """
+
+    def __init__(self, quality_terms: Dict[str, List[str]], scoring: Dict[str, float],
+                 skip_patterns: Iterable[str] = ()):
+        self.scoring = scoring
+        self.matcher = TermMatcher({c: quality_terms.get(c, []) for c in CATEGORIES})
+        self.skip_matcher = TermMatcher({"skip": skip_patterns})
+        self.weights = {
+            "high_value_terms": scoring['high_value_bonus'],
+            "medium_terms": scoring['medium_bonus'],
+            "low_effort_terms": -scoring['low_effort_penalty'],
+            "duration_terms": scoring['duration_bonus'],
+        }
+
+    def should_skip(self, title: str) -> bool:
+        return self.skip_matcher.any(title)
+
+    def score(self, title: str, description: str = "") -> float:
+        hits = self.matcher.counts(title)
+        score = sum(self.weights[c] * n for c, n in hits.items())
+        if len(description) > self.scoring['long_description_threshold']:
+            score += self.scoring['long_description_bonus']
+        elif len(description) > self.scoring['medium_description_threshold']:
+            score += self.scoring['medium_description_bonus']
+        return score
+
+    def score_many(self, videos: Iterable[Dict]) -> List[float]:
+        return [self.score(v.get("title", ""), v.get("description", "") or "") for v in videos]
@@ -0,0 +1,124 @@
+"""
+Scouter configuration, loaded on demand.
+
+Parsing the YAML (and importing PyYAML at all) is the slowest part of
+starting a pass; the parsed dict is pickled next to the config file and
+reused for as long as the YAML's mtime and size are unchanged. A long-lived
+process keeps one ScouterConfig and only reloads when is_stale() says the
+file was edited.
+"""
+
+import os
+import pickle
+from typing import Dict, Optional
+
+from openclaw_common.state_file import atomic_write
+
+DEFAULT_PATH = "youtube-scouter-config.yaml"
+SNAPSHOT_SUFFIX = ".pickle"
+SNAPSHOT_VERSION = 1
+
+
+def _file_key(path: str):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_snapshot(snapshot_path: str, key) -> Optional[dict]:
+    try:
+        with open(snapshot_path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    if tuple(snapshot.get("key", ())) != key:
+        return None
+    return snapshot.get("data")
+
+
+def _write_snapshot(snapshot_path: str, key, data: dict):
+    snapshot = {"version": SNAPSHOT_VERSION, "key": key, "data": data}
+    atomic_write(snapshot_path, pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL))
+
+
+def load_config_data(path: str = DEFAULT_PATH, snapshot_path: str = None) -> dict:
+    """Parsed YAML, from the snapshot when it matches the file's mtime and size."""
+    snapshot_path = snapshot_path or path + SNAPSHOT_SUFFIX
+    key = _file_key(path)
+    data = _read_snapshot(snapshot_path, key)
+    if data is not None:
+        return data
+    import yaml
+    with open(path, 'r') as f:
+        data = yaml.safe_load(f)
+    try:
+        _write_snapshot(snapshot_path, key, data)
+    except OSError:
+        pass  # read-only checkout: parse the YAML every time
+    return data
+
+
+class ScouterConfig:
+    def __init__(self, data: dict, path: str = None, env: Dict[str, str] = None):
+        env = os.environ if env is None else env
+        self.data = data
+        self.path = path
+        self._key = _file_key(path) if path and os.path.exists(path) else None
+        self.youtube_api_key = env.get("YOUTUBE_API_KEY")
+        self.notion_api_key = env.get("NOTION_TOKEN") or env.get("NOTION_API_KEY")
+        self.transcript_api_key = env.get("TRANSCRIPT_API_KEY")
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH, snapshot_path: str = None) -> "ScouterConfig":
+        return cls(load_config_data(path, snapshot_path), path)
+
+    def is_stale(self) -> bool:
+        """True if the YAML changed (or vanished) since this config was loaded."""
+        if not self.path:
+            return False
+        try:
+            return _file_key(self.path) != self._key
+        except OSError:
+            return True
+
+    # ---- sections ----
+    @property
+    def sources(self) -> dict:
+        return self.data['sources']
+
+    @property
+    def rss(self) -> dict:
+        return self.sources['rss']
+
+    @property
+    def search(self) -> dict:
+        return self.sources['search']
+
+    @property
+    def details(self) -> dict:
+        return self.sources.get('details', {})
+
+    @property
+    def fallback(self) -> dict:
+        return self.data.get('fallback', {})
+
+    @property
+    def filtering(self) -> dict:
+        return self.data['filtering']
+
+    @property
+    def quality_terms(self) -> dict:
+        return self.data['quality_terms']
+
+    @property
+    def scoring(self) -> dict:
+        return self.data['scoring']
+
+    @property
+    def notion(self) -> dict:
+        return self.data['notion']
+
+    @property
+    def output(self) -> dict:
+        return self.data['output']
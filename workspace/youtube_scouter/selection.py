@@ -0,0 +1,99 @@
+"""
+Diversity-aware top-k selection over ranked candidates.
+
+Picks are made greedily by maximal marginal relevance (MMR):
+
+    mmr(v) = lam * rel(v) - (1 - lam) * max over picks p of sim(v, p)
+
+rel is rank_score min-max scaled to 0..1 over the candidates and sim is the
+Jaccard similarity of the title word sets. Hard limits apply on top: at most
+per_channel picks from one channel, at most per_topic from one search topic,
+and nothing at least max_similarity similar to an earlier pick.
+
+A candidate's similarity to the picks can only grow as picks are added, so
+its last computed MMR value is an upper bound on its current one. That makes
+the lazy greedy exact: all candidates sit in one heap keyed by their last
+value; the best is popped, and if it was scored against fewer picks than
+there are now, it is updated against just the new picks and pushed back.
+Nothing is re-sorted between picks and most candidates are never re-scored.
+Likewise the caps only tighten, so a capped candidate is dropped for good.
+"""
+
+import heapq
+import re
+from typing import Dict, FrozenSet, List, Optional
+
+_WORD_RE = re.compile(r"\w+")
+UNCAPPED_CHANNELS = ("", "unknown")
+
+
+def title_tokens(title: str) -> FrozenSet[str]:
+    return frozenset(w for w in _WORD_RE.findall(title.lower()) if len(w) > 1)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+class DiverseSelector:
+    def __init__(self, per_channel: Optional[int] = None, per_topic: Optional[int] = None,
+                 mmr_lambda: float = 0.7, max_similarity: Optional[float] = 0.8):
+        self.per_channel = per_channel
+        self.per_topic = per_topic
+        self.mmr_lambda = mmr_lambda
+        self.max_similarity = max_similarity
+        self.last_stats: Dict[str, int] = {}
+
+    def select(self, videos: List[Dict], k: int) -> List[Dict]:
+        """Up to k videos in pick order; videos must already carry rank_score."""
+        stats = {"candidates": len(videos), "capped_channel": 0, "capped_topic": 0,
+                 "near_duplicates": 0, "rescored": 0}
+        self.last_stats = stats
+        if not videos or k <= 0:
+            return []
+        lam = self.mmr_lambda
+        scores = [v.get("rank_score", 0.0) for v in videos]
+        low = min(scores)
+        spread = (max(scores) - low) or 1.0
+        relevance = [(s - low) / spread for s in scores]
+        tokens: List[Optional[FrozenSet[str]]] = [None] * len(videos)
+        max_sim = [0.0] * len(videos)
+        checked = [0] * len(videos)  # picks already compared against
+
+        heap = [(-lam * rel, i) for i, rel in enumerate(relevance)]  # ties keep input order
+        heapq.heapify(heap)
+        picks, pick_tokens = [], []
+        per_channel, per_topic = {}, {}
+        while heap and len(picks) < k:
+            _, i = heapq.heappop(heap)
+            video = videos[i]
+            channel = (video.get("channel") or "").lower()
+            topic = video.get("query") or ""
+            if self.per_channel and channel not in UNCAPPED_CHANNELS and per_channel.get(channel, 0) >= self.per_channel:
+                stats["capped_channel"] += 1
+                continue
+            if self.per_topic and topic and per_topic.get(topic, 0) >= self.per_topic:
+                stats["capped_topic"] += 1
+                continue
+            if tokens[i] is None:
+                tokens[i] = title_tokens(video.get("title", ""))
+            if checked[i] < len(picks):
+                for other in pick_tokens[checked[i]:]:
+                    max_sim[i] = max(max_sim[i], jaccard(tokens[i], other))
+                checked[i] = len(picks)
+                stats["rescored"] += 1
+                if self.max_similarity is not None and max_sim[i] >= self.max_similarity:
+                    stats["near_duplicates"] += 1
+                    continue
+                heapq.heappush(heap, (-(lam * relevance[i] - (1 - lam) * max_sim[i]), i))
+                continue
+            picks.append(video)
+            pick_tokens.append(tokens[i])
+            if channel not in UNCAPPED_CHANNELS:
+                per_channel[channel] = per_channel.get(channel, 0) + 1
+            if topic:
+                per_topic[topic] = per_topic.get(topic, 0) + 1
+        return picks
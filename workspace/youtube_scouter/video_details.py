@@ -0,0 +1,165 @@
+"""
+Video metadata from the Data API videos.list endpoint.
+
+videos.list takes up to 50 IDs per call and costs 1 quota unit per call
+(search.list costs 100), so enriching a whole run's candidates with real
+durations, view/like counts and full descriptions costs a few units. Results
+are cached per video_id for ttl_hours: durations never change and counts that
+are a day old are good enough for ranking. IDs the API does not return
+(private, deleted) are cached as unavailable.
+"""
+
+import json
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from openclaw_common.state_file import atomic_write, load_json
+
+VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+VIDEOS_PARTS = "contentDetails,statistics,snippet"
+BATCH_SIZE = 50
+BATCH_COST = 1
+
+_DURATION_RE = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+def parse_iso_duration(value: str) -> Optional[int]:
+    """Seconds from an ISO 8601 duration ("PT1H2M3S"); None for live/upcoming ("P0D") or junk."""
+    match = _DURATION_RE.match(value or "")
+    if not match or not any(match.groups()):
+        return None
+    days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    total = ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+    return total or None
+
+
+def _int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def details_from_item(item: Dict) -> Dict:
+    snippet = item.get("snippet", {})
+    stats = item.get("statistics", {})
+    views = _int(stats.get("viewCount"))
+    likes = _int(stats.get("likeCount"))  # absent when the owner hides likes
+    return {
+        "duration_seconds": parse_iso_duration(item.get("contentDetails", {}).get("duration", "")),
+        "view_count": views,
+        "like_count": likes,
+        "like_ratio": likes / views if views and likes is not None else None,
+        "description": snippet.get("description", ""),
+        "published_at": snippet.get("publishedAt", ""),
+        "live": snippet.get("liveBroadcastContent", "none") != "none",
+    }
+
+
+class VideoDetailsCache:
+    def __init__(self, path: str, ttl_hours: float = 24, max_entries: int = 5000):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.max_entries = max_entries
+        self._records = None  # loaded on first use
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def _load(self) -> Dict[str, dict]:
+        if self._records is None:
+            self._records = load_json(self.path, {}).get("videos", {})
+        return self._records
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def get(self, video_id: str, now: float = None) -> Optional[dict]:
+        now = time.time() if now is None else now
+        with self._lock:
+            record = self._load().get(video_id)
+            if record is None or now - record.get("fetched_at", 0) > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return record
+
+    def put(self, video_id: str, details: Optional[Dict]) -> dict:
+        """details=None records that the API did not return the video."""
+        with self._lock:
+            record = dict(details) if details is not None else {"unavailable": True}
+            record["fetched_at"] = time.time()
+            self._load()[video_id] = record
+            self._dirty = True
+            return record
+
+    def evict(self, now: float = None) -> int:
+        now = time.time() if now is None else now
+        with self._lock:
+            records = self._load()
+            stale = [vid for vid, r in records.items() if now - r.get("fetched_at", 0) > self.ttl]
+            for vid in stale:
+                del records[vid]
+            overflow = len(records) - self.max_entries
+            if overflow > 0:
+                oldest = sorted(records, key=lambda vid: records[vid].get("fetched_at", 0))[:overflow]
+                for vid in oldest:
+                    del records[vid]
+                stale.extend(oldest)
+            if stale:
+                self._dirty = True
+            return len(stale)
+
+    def save(self):
+        """Evict, then write atomically (temp file + rename)."""
+        self.evict()
+        with self._lock:
+            if not self._dirty:
+                return
+            atomic_write(self.path, json.dumps({"videos": self._records}, ensure_ascii=False))
+            self._dirty = False
+
+
+class VideoDetailsFetcher:
+    def __init__(self, cache: VideoDetailsCache, fetch: Callable[[List[str]], List[Dict]],
+                 charge: Callable[[int], bool]):
+        """fetch(ids) returns the videos.list items (raising on API errors); charge(units) reserves quota."""
+        self.cache = cache
+        self.fetch = fetch
+        self.charge = charge
+        self.stats = {"cached": 0, "calls": 0, "fetched": 0, "not_fetched": 0}
+        self.error: Optional[str] = None
+
+    def lookup(self, video_ids: Iterable[str]) -> Dict[str, dict]:
+        """video_id -> cached or freshly fetched record, in as few batches as possible.
+
+        IDs left out (no quota, API error) are simply absent from the result.
+        """
+        found, missing = {}, []
+        for video_id in dict.fromkeys(video_ids):
+            record = self.cache.get(video_id)
+            if record is None:
+                missing.append(video_id)
+            else:
+                found[video_id] = record
+                self.stats["cached"] += 1
+        for start in range(0, len(missing), BATCH_SIZE):
+            batch = missing[start:start + BATCH_SIZE]
+            if self.error or not self.charge(BATCH_COST):
+                self.stats["not_fetched"] += len(missing) - start
+                break
+            try:
+                items = self.fetch(batch)
+            except Exception as e:
+                self.error = str(e)
+                self.stats["not_fetched"] += len(missing) - start
+                break
+            self.stats["calls"] += 1
+            returned = {item.get("id"): details_from_item(item) for item in items}
+            for video_id in batch:
+                found[video_id] = self.cache.put(video_id, returned.get(video_id))
+            self.stats["fetched"] += len(returned)
+        return found
@@ -0,0 +1,86 @@
+"""
+Persistent index of video IDs that have already been recommended.
+
+Backed by a small SQLite table so membership survives across runs without
+re-reading the whole history file. The IDs are loaded into a set on the
+first lookup (O(1) membership afterwards); new IDs are written through.
+The index is derived data: delete the .db file and it is rebuilt from the
+seed (the video history) on next use. A seed watermark (e.g. the history's
+length) is stored alongside the IDs; when it has moved since the last open,
+IDs recorded in the history by another process or an older run are topped up.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+
+class VideoIndex:
+    def __init__(self, path: str, seed: Optional[Callable[[], Iterable[str]]] = None,
+                 seed_mark: Optional[Callable[[], object]] = None):
+        """seed() -> every ID in the history; seed_mark() -> cheap value that changes when the history does.
+
+        Without seed_mark the index is only seeded while it is empty.
+        """
+        self.path = path
+        self.seed = seed
+        self.seed_mark = seed_mark
+        self._ids = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._ids is not None:
+            return
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (video_id TEXT PRIMARY KEY, added_at TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._ids = {row[0] for row in self._conn.execute("SELECT video_id FROM seen")}
+        if self.seed is None:
+            return
+        if self.seed_mark is None:
+            if not self._ids:
+                self._insert(self.seed())
+            return
+        mark = str(self.seed_mark())
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'seed_mark'").fetchone()
+        if self._ids and row is not None and row[0] == mark:
+            return
+        self._insert(self.seed())
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seed_mark', ?)", (mark,))
+
+    def _insert(self, video_ids: Iterable[str]):
+        now = datetime.now().strftime("%Y-%m-%d")
+        new_ids = [vid for vid in dict.fromkeys(video_ids) if vid and vid not in self._ids]
+        if not new_ids:
+            return
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO seen (video_id, added_at) VALUES (?, ?)",
+                                   [(vid, now) for vid in new_ids])
+        self._ids.update(new_ids)
+
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            return video_id in self._ids
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._ids)
+
+    def add(self, video_id: str):
+        self.add_many([video_id])
+
+    def add_many(self, video_ids: Iterable[str]):
+        with self._lock:
+            self._ensure_loaded()
+            self._insert(video_ids)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = self._ids = None
@@ -8,40 +8,78 @@ Features:
 - Auto-update missing Channel IDs from Notion
 """
 
-import os, sys, json, traceback, subprocess, time, re
+import os, sys, traceback, time, re, threading
+import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from openclaw_common.fetch_pool import FetchPool, host_of_url
+from openclaw_common.http_client import HttpError, default_client
+from openclaw_common.notion_writer import NotionWriter
+from openclaw_common.metrics import RunMetrics
+from rss_cache import RssCache
+from rss_parser import collect_rss_entries
+from scoring import QualityScorer
+from ranking import DEFAULT_WEIGHTS, Ranker
+from selection import DiverseSelector
+from video_index import VideoIndex
+from history_store import open_history_store
+from quota_planner import SEARCH_COST, QuotaBudget
+from channel_mirror import ChannelMirror, NotionQueryError
+from channel_resolver import ChannelResolver, ResolverCache
+from scouter_config import ScouterConfig
+from yt_initial_data import extract_search_results
+from video_details import BATCH_SIZE, VIDEOS_PARTS, VIDEOS_URL, VideoDetailsCache, VideoDetailsFetcher
 
 # ====== CONFIG ======
+# Importing the module reads nothing: configure() (called by run()) fills in the
+# settings below and builds the clients, caches and indexes that depend on them.
 CONFIG_PATH = "youtube-scouter-config.yaml"
 LOG_FILE = "youtube-scouter.log"
 
-def load_config():
-    import yaml
-    with open(CONFIG_PATH, 'r') as f:
-        return yaml.safe_load(f)
+settings: Optional[ScouterConfig] = None
 
-config = load_config()
-
-YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-NOTION_API_KEY = os.getenv("NOTION_TOKEN") or os.getenv("NOTION_API_KEY")
-TRANSCRIPT_API_KEY = os.getenv("TRANSCRIPT_API_KEY")
+YOUTUBE_API_KEY = NOTION_API_KEY = TRANSCRIPT_API_KEY = None
 
 # Database IDs
-CHANNEL_DB_ID = config['notion']['channel_db_id']
-RESULTS_DB_ID = config['notion']['results_db_id']
-LOG_DB_ID = config['notion']['log_db_id']
-
-SOURCES = config['sources']
-RSS_CONFIG = SOURCES['rss']
-SEARCH_CONFIG = SOURCES['search']
-FALLBACK_CONFIG = config.get('fallback', {})
-FILTERING = config['filtering']
-QUALITY_TERMS = config['quality_terms']
-SCORING = config['scoring']
-NOTION_CONFIG = config['notion']
-OUTPUT_CONFIG = config['output']
-VIDEOS_PATH = OUTPUT_CONFIG['videos_path']
+CHANNEL_DB_ID = RESULTS_DB_ID = LOG_DB_ID = None
+
+SOURCES = RSS_CONFIG = SEARCH_CONFIG = DETAILS_CONFIG = FALLBACK_CONFIG = None
+FILTERING = QUALITY_TERMS = SCORING = NOTION_CONFIG = OUTPUT_CONFIG = None
+VIDEOS_PATH = None
+
+# Clients, caches and indexes: built by configure(), kept across passes until shutdown()
+# Page creates/updates go through one rate-limited queue (~3 req/s, honours Retry-After)
+notion_writer: Optional[NotionWriter] = None
+# Daily Data API budget shared by topic search and channel lookups (quota_reserve is in search calls)
+quota_budget: Optional[QuotaBudget] = None
+# quality_terms and skip_patterns compiled once into a single matcher
+quality_scorer: Optional[QualityScorer] = None
+rss_cache: Optional[RssCache] = None
+# videos.list results per video_id (1 quota unit per 50 IDs), kept for sources.details.cache_hours
+video_details_cache: Optional[VideoDetailsCache] = None
+# Weighted ranking features (scoring.weights), then capped MMR selection of the top k
+ranker: Optional[Ranker] = None
+selector: Optional[DiverseSelector] = None
+# Local copy of the channel database, refreshed by last_edited_time
+channel_mirror: Optional[ChannelMirror] = None
+# Remembered resolutions (and misses, retried with backoff) for rows without a Channel ID
+channel_resolver: Optional[ChannelResolver] = None
+# Seen-ID index for dedup; topped up from the history store whenever the history's length has moved
+video_index: Optional[VideoIndex] = None
+_history_store = None  # opened on first use by get_history_store()
+
+# Per-pass state, started over by run()
+failure_tracker: Optional["FailureTracker"] = None
+metrics: Optional[RunMetrics] = None
+
+# ====== HTTP ======
+http = default_client()
+BROWSER_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+def notion_headers(version: str = "2022-06-28") -> Dict[str, str]:
+    return {"Authorization": f"Bearer {NOTION_API_KEY}", "Notion-Version": version}
 
 # ====== LOGGING (simple, no recursion) ======
 log_lines = []
@@ -112,22 +150,14 @@ def push_log_to_notion(success: bool, error_msg: str = None):
             }
         })
     
-    cmd = [
-        "curl", "-s", "-X", "POST", "https://api.notion.com/v1/pages",
-        "-H", f"Authorization: Bearer {NOTION_API_KEY}",
-        "-H", "Notion-Version: 2022-06-28",
-        "-H", "Content-Type: application/json",
-        "-d", json.dumps(payload)
-    ]
-    
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        response = json.loads(result.stdout) if result.stdout else {}
-        if result.returncode == 0:
+        resp = http.post("https://api.notion.com/v1/pages", headers=notion_headers(), json_body=payload, timeout=30)
+        if resp.ok:
             log(f"Log pushed to Notion: {run_result}", "SUCCESS")
             return True
         else:
-            error_detail = response.get('message', result.stderr[:200])
+            try: error_detail = resp.json().get('message', resp.text[:200])
+            except ValueError: error_detail = resp.text[:200]
             log(f"Failed to push log to Notion: {error_detail}", "ERROR")
             return False
     except Exception as e:
@@ -138,58 +168,81 @@ def push_log_to_notion(success: bool, error_msg: str = None):
 class FailureTracker:
     def __init__(self):
         self.rss_failures = self.search_failures = self.scrape_fallbacks = 0
-    def record_rss_failure(self): self.rss_failures += 1
-    def record_search_failure(self): self.search_failures += 1
-    def record_scrape_fallback(self): self.scrape_fallbacks += 1
+        self._lock = threading.Lock()  # RSS feeds are fetched from worker threads
+    def record_rss_failure(self):
+        with self._lock: self.rss_failures += 1
+    def record_search_failure(self):
+        with self._lock: self.search_failures += 1
+    def record_scrape_fallback(self):
+        with self._lock: self.scrape_fallbacks += 1
     def get_rss_penalty(self): return min(self.rss_failures * 0.1, 1.0)
     def get_search_penalty(self): return min(self.search_failures * 0.1, 1.0)
     def get_scrape_penalty(self): return SCORING.get('scrape_penalty', -0.5) + min(self.scrape_fallbacks * 0.1, 0.5)
 
-failure_tracker = FailureTracker()
+# ====== METRICS ======
+def new_run_metrics() -> RunMetrics:
+    """Per-stage spans: duration plus what each counter moved while the stage ran."""
+    return RunMetrics("youtube_scouter", {
+        "requests": lambda: http.stats()["requests"],
+        "bytes_sent": lambda: http.stats()["bytes_sent"],
+        "bytes_received": lambda: http.stats()["bytes_received"],
+        "retries": lambda: http.stats()["retries"] + (notion_writer.retries if notion_writer else 0),
+        "quota_units": lambda: quota_budget.used if quota_budget else 0,
+    })
+
+def write_metrics(success: bool):
+    try:
+        metrics.write_json(OUTPUT_CONFIG.get('metrics_path', 'youtube-scouter-metrics.json'), success)
+        if OUTPUT_CONFIG.get('metrics_prometheus_path'):
+            metrics.write_prometheus(OUTPUT_CONFIG['metrics_prometheus_path'], success)
+    except OSError as e:
+        print(f"[ERROR] Failed to write metrics: {e}")
 
 # ====== HELPER FUNCTIONS ======
-def load_video_history():
-    if os.path.exists(VIDEOS_PATH):
-        try:
-            with open(VIDEOS_PATH, 'r') as f:
-                return json.load(f)
-        except: pass
-    return {"recommended_videos": []}
-
-def save_video_history(history):
-    with open(VIDEOS_PATH, 'w') as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
-
-def curl_notion(url: str, data: dict = None):
-    cmd = ["curl", "-s", "-X", "POST", url,
-           "-H", f"Authorization: Bearer {NOTION_API_KEY}",
-           "-H", "Notion-Version: 2022-06-28", "-H", "Content-Type: application/json"]
-    if data: cmd.extend(["-d", json.dumps(data)])
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-    if result.returncode != 0: return {"error": f"curl failed: {result.stderr}"}
-    try: return json.loads(result.stdout)
-    except: return {"error": "Failed to parse JSON"}
+def get_history_store():
+    """Open the history backend on first use (migrating the legacy JSON file once)."""
+    global _history_store
+    if _history_store is None:
+        _history_store = open_history_store(OUTPUT_CONFIG.get('history_path', 'youtube-scouter-videos.jsonl'),
+                                            OUTPUT_CONFIG.get('history_backend', 'jsonl'),
+                                            legacy_json_path=VIDEOS_PATH)
+    return _history_store
+
+def notion_post(url: str, data: dict = None, idempotent: bool = None):
+    """POST to the Notion API (idempotent=True for read-only queries); errors come back as Notion's error object."""
+    try:
+        resp = http.post(url, headers=notion_headers(), json_body=data or {}, timeout=30, idempotent=idempotent)
+    except HttpError as e:
+        return {"error": f"request failed: {e}"}
+    try: return resp.json()
+    except ValueError: return {"error": "Failed to parse JSON"}
 
 def fetch_channels_from_notion():
     """Fetch channels from Tech Youtuber database - with auto-update for missing Channel IDs"""
     if not NOTION_API_KEY:
         log("No NOTION_API_KEY configured", "WARNING")
         return {}
-    log(f"Fetching channels from Notion database...")
-    data = curl_notion(f"https://api.notion.com/v1/databases/{CHANNEL_DB_ID}/query", {})
-
-    # Handle empty or error responses
-    if data.get("object") == "error":
-        log(f"Notion API error: {data.get('code', 'unknown')}", "ERROR")
-        return {}
-    if not data.get("results"):
+    log(f"Syncing channel mirror ({len(channel_mirror)} channels cached)...")
+    try:
+        stats = channel_mirror.sync()
+        channel_mirror.save()
+        log(f"  {stats['mode']} sync: {stats['changed']} changed rows, {stats['requests']} requests")
+    except NotionQueryError as e:
+        if not len(channel_mirror):
+            log(f"Notion API error: {e}", "ERROR")
+            return {}
+        log(f"Notion API error: {e} - using {len(channel_mirror)} mirrored channels", "WARNING")
+    except OSError as e:
+        log(f"Failed to save channel mirror: {e}", "WARNING")
+
+    if not len(channel_mirror):
         log(f"Notion returned empty results - database may be empty or query failed", "WARNING")
         return {}
 
     channels = {}
     channels_needing_update = []  # Track channels missing Channel ID
 
-    for page in data.get("results", []):
+    for page in channel_mirror.pages():
         props = page.get("properties", {})
         page_id = page.get("id")
 
@@ -233,7 +286,8 @@ def fetch_channels_from_notion():
     # Auto-update missing Channel IDs if TRANSCRIPT_API_KEY is available
     if channels_needing_update:
         log(f"Found {len(channels_needing_update)} channels needing Channel ID update")
-        update_missing_channel_ids(channels_needing_update, channels)
+        with metrics.span("channel_ids", channels=len(channels_needing_update)):
+            update_missing_channel_ids(channels_needing_update, channels)
 
     return channels
 
@@ -243,51 +297,43 @@ def resolve_channel_id_via_transcriptapi(homepage: str) -> str:
     if not TRANSCRIPT_API_KEY:
         return ""
 
-    import urllib.parse
-    encoded = urllib.parse.quote(homepage)
-    url = f"https://transcriptapi.com/api/v2/youtube/channel/resolve?input={encoded}"
-
-    cmd = ["curl", "-s", "-X", "GET", url, "-H", f"Authorization: Bearer {TRANSCRIPT_API_KEY}"]
-
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        data = json.loads(result.stdout)
-        return data.get("channel_id", "") if "channel_id" in data else ""
-    except:
+        resp = http.get("https://transcriptapi.com/api/v2/youtube/channel/resolve",
+                        params={"input": homepage},
+                        headers={"Authorization": f"Bearer {TRANSCRIPT_API_KEY}"}, timeout=30)
+        if not resp.ok:
+            return ""
+        return resp.json().get("channel_id", "") or ""
+    except (HttpError, ValueError, AttributeError):
         return ""
 
 
 def scrape_youtube_search(channel_name: str) -> str:
     """Search YouTube and find channel URL"""
-    import urllib.parse
-    search_url = f"https://www.youtube.com/results?search_query={urllib.parse.quote(channel_name)}"
-
     try:
-        result = subprocess.run(
-            ["curl", "-s", "-L", "-A", "Mozilla/5.0", "-m", "15", search_url],
-            capture_output=True, text=True, timeout=20
-        )
-        if result.returncode != 0:
+        resp = http.get("https://www.youtube.com/results", params={"search_query": channel_name},
+                        headers=BROWSER_HEADERS, timeout=15)
+        if not resp.ok:
             return ""
 
-        content = result.stdout
+        content = resp.text
+        results = extract_search_results(content)
+        # Channel results first, then the channels of the video results, in page order
+        candidates = [(c["channel_id"], c["title"]) for c in results.channels]
+        candidates += [(v["channel_id"], v["channel"]) for v in results.videos if v["channel_id"]]
 
-        # Method 1: Find channel IDs in JSON data
-        channel_data = re.findall(r'"channelId":"(UC[^"]+)","[^"]+":"([^"]+)"', content)
-
-        # Try to match by channel name
-        for cid, cname in channel_data[:15]:
+        # Method 1: Try to match by channel name
+        for cid, cname in candidates[:15]:
             if channel_name.lower() in cname.lower():
                 log(f"    → Matched: {cname}", "SUCCESS")
                 return f"https://www.youtube.com/channel/{cid}"
 
         # Method 2: If no exact match, use first channel
-        channel_ids = re.findall(r'"channelId":"(UC[a-zA-Z0-9_-]{22})"', content)
-        if channel_ids:
+        if candidates:
             log(f"    → Using first channel result", "INFO")
-            return f"https://www.youtube.com/channel/{channel_ids[0]}"
+            return f"https://www.youtube.com/channel/{candidates[0][0]}"
 
-        # Method 3: Look for /@handle URLs
+        # Method 3: Look for /@handle URLs (pages without ytInitialData)
         handles = re.findall(r'youtube\.com/@([a-zA-Z0-9_.-]+)', content)
         if handles:
             log(f"    → Found @handle: {handles[0]}", "INFO")
@@ -301,19 +347,20 @@ def scrape_youtube_search(channel_name: str) -> str:
 
 def search_youtube_api_for_channel(channel_name: str) -> str:
     """Search YouTube API for channel (fallback)"""
-    if not YOUTUBE_API_KEY:
+    if not YOUTUBE_API_KEY or not quota_budget.try_charge(SEARCH_COST):
         return ""
 
-    import urllib.parse
-    query = urllib.parse.quote(f"{channel_name} channel")
-    url = f"https://www.googleapis.com/youtube/v3/search?part=snippet&q={query}&type=channel&maxResults=3&key={YOUTUBE_API_KEY}"
+    params = {"part": "snippet", "q": f"{channel_name} channel", "type": "channel", "maxResults": 3, "key": YOUTUBE_API_KEY}
 
     try:
-        result = subprocess.run(["curl", "-s", "-m", "10", url], capture_output=True, text=True, timeout=15)
-        data = json.loads(result.stdout)
+        data = http.get("https://www.googleapis.com/youtube/v3/search", params=params, timeout=10, retries=0).json()
 
         if "error" in data:
-            log(f"    ⚠️ YouTube API quota exceeded", "WARNING")
+            if is_quota_error(data):
+                quota_budget.mark_exhausted()
+                log(f"    ⚠️ YouTube API quota exceeded", "WARNING")
+            else:
+                log(f"    ⚠️ YouTube API error: {data['error'].get('message', 'unknown')}", "WARNING")
             return ""
 
         for item in data.get("items", []):
@@ -322,14 +369,13 @@ def search_youtube_api_for_channel(channel_name: str) -> str:
                 cid = item.get("id", {}).get("channelId", "")
                 log(f"    → Found via API: {title}", "SUCCESS")
                 return f"https://www.youtube.com/channel/{cid}"
-    except:
+    except (HttpError, ValueError):
         pass
     return ""
 
 
-def update_notion_page(page_id: str, updates: dict) -> bool:
-    """Update Notion page with Homepage and/or Channel ID"""
-    url = f"https://api.notion.com/v1/pages/{page_id}"
+def update_notion_page(page_id: str, updates: dict):
+    """Queue a Homepage and/or Channel ID update on the Notion writer; returns the Future."""
     payload = {"properties": {}}
 
     if "homepage" in updates:
@@ -337,90 +383,74 @@ def update_notion_page(page_id: str, updates: dict) -> bool:
     if "channel_id" in updates:
         payload["properties"]["Channel ID"] = {"rich_text": [{"text": {"content": updates["channel_id"]}}]}
 
-    cmd = ["curl", "-s", "-X", "PATCH", url,
-           "-H", f"Authorization: Bearer {NOTION_API_KEY}",
-           "-H", "Notion-Version: 2022-06-28",
-           "-H", "Content-Type: application/json",
-           "-d", json.dumps(payload)]
+    return notion_writer.update_page(page_id, payload)
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-    return result.returncode == 0
 
+def find_channel_url(channel_name: str) -> str:
+    """Channel URL for a name: Data API search first, then the results page."""
+    return search_youtube_api_for_channel(channel_name) or scrape_youtube_search(channel_name)
 
 def update_missing_channel_ids(channels_needing_update: List[Dict], existing_channels: Dict):
-    """Update missing Channel IDs in Notion - called before fetching RSS"""
+    """Update missing Channel IDs in Notion - called before fetching RSS.
+
+    Channels are resolved concurrently; the Notion updates go through the shared writer queue.
+    """
     if not TRANSCRIPT_API_KEY:
         log("⚠️ TRANSCRIPT_API_KEY not set - cannot auto-update Channel IDs", "WARNING")
         return
 
-    updated_count = 0
-    failed_count = 0
+    workers = NOTION_CONFIG.get('channel_resolve_workers', 4)
+    pool = FetchPool(max_workers=workers, per_host_limit=workers)
+    # Every lookup chain starts (and usually ends) at TranscriptAPI, so that is the host being limited
+    results = pool.map(lambda item: channel_resolver.resolve(item["name"], item["homepage"]),
+                       channels_needing_update, host_of=lambda _: "transcriptapi.com")
 
-    for item in channels_needing_update:
+    updated_count = failed_count = deferred_count = 0
+    pending = []
+    for result in results:
+        item = result.item
         name = item["name"] or "Unnamed"
-        homepage = item["homepage"]
-        page_id = item["page_id"]
-
-        log(f"  🔍 Resolving Channel ID for: {name}")
-
-        channel_id = ""
-
-        # Strategy 1: Use TranscriptAPI with Homepage
-        if homepage:
-            log(f"    → Using Homepage: {homepage}")
-            channel_id = resolve_channel_id_via_transcriptapi(homepage)
-
-        # Strategy 2: Search YouTube if no Homepage or resolution failed
-        if not channel_id and name:
-            log(f"    → Searching YouTube for: {name}")
-            channel_url = search_youtube_api_for_channel(name)
-            if not channel_url:
-                channel_url = scrape_youtube_search(name)
-
-            if channel_url:
-                channel_id = resolve_channel_id_via_transcriptapi(channel_url)
-                if channel_id:
-                    # Also update Homepage if we found one
-                    if update_notion_page(page_id, {"homepage": channel_url, "channel_id": channel_id}):
-                        log(f"    ✅ Updated Homepage AND Channel ID: {channel_id}", "SUCCESS")
-                        updated_count += 1
-                        # Add to existing channels for this run
-                        existing_channels[name] = channel_id
-                        continue
-                    else:
-                        failed_count += 1
-                else:
-                    # Update Homepage at least
-                    if update_notion_page(page_id, {"homepage": channel_url}):
-                        log(f"    ⚠️ Updated Homepage only (Channel ID resolution failed)", "WARNING")
-                    else:
-                        failed_count += 1
-            else:
-                failed_count += 1
-                log(f"    ❌ Could not find channel on YouTube", "ERROR")
-                continue
-
-        # Strategy 3: Direct resolution if we have homepage but no channel_id yet
-        if not channel_id and homepage:
-            # Already tried above, mark as failed
+        if result.error:
+            log(f"  ❌ {name}: {result.error}", "ERROR")
+            failed_count += 1
+            continue
+        resolution = result.value
+        if resolution.deferred:
+            log(f"  ⏭️ {name}: not found on earlier runs - retrying after backoff")
+            deferred_count += 1
+            continue
+        updates = {}
+        if resolution.channel_url and resolution.channel_url != item["homepage"]:
+            updates["homepage"] = resolution.channel_url
+        if resolution.channel_id:
+            updates["channel_id"] = resolution.channel_id
+        if not updates:
+            log(f"  ❌ {name}: could not find channel on YouTube", "ERROR")
             failed_count += 1
             continue
+        pending.append((name, resolution, update_notion_page(item["page_id"], updates)))
 
-        if channel_id:
-            if update_notion_page(page_id, {"channel_id": channel_id}):
-                log(f"    ✅ Updated Channel ID: {channel_id}", "SUCCESS")
-                updated_count += 1
-                # Add to existing channels for this run
-                existing_channels[name] = channel_id
-            else:
-                log(f"    ❌ Failed to update Notion", "ERROR")
-                failed_count += 1
+    for name, resolution, future in pending:
+        if not future.result().ok:
+            log(f"  ❌ {name}: failed to update Notion", "ERROR")
+            failed_count += 1
+        elif resolution.channel_id:
+            cached = ", cached" if resolution.cached else ""
+            log(f"  ✅ {name}: Channel ID {resolution.channel_id} (via {resolution.source}{cached})", "SUCCESS")
+            updated_count += 1
+            # Add to existing channels for this run
+            existing_channels[name] = resolution.channel_id
         else:
+            log(f"  ⚠️ {name}: updated Homepage only (Channel ID resolution failed)", "WARNING")
             failed_count += 1
 
-        time.sleep(0.5)  # Rate limiting
-
-    log(f"  📊 Channel ID Update: {updated_count} updated, {failed_count} failed")
+    cache = channel_resolver.cache
+    log(f"  📊 Channel ID Update: {updated_count} updated, {failed_count} failed, {deferred_count} deferred "
+        f"({cache.lookups} looked up, {cache.hits} from cache)")
+    try:
+        cache.save()
+    except OSError as e:
+        log(f"Failed to save resolver cache: {e}", "WARNING")
 
 def fetch_channel_rss_with_retry(channel_id: str, channel_name: str, max_retries: int = 3):
     for attempt in range(max_retries):
@@ -437,82 +467,119 @@ def fetch_channel_rss_with_retry(channel_id: str, channel_name: str, max_retries
             time.sleep(1 * (attempt + 1))
     return []
 
+def rss_feed_url(channel_id: str) -> str:
+    return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+
+def fetch_all_channel_rss(channels: Dict[str, str]):
+    """Fetch every channel feed concurrently.
+
+    Returns FetchResults in the same order as channels.items(); each result's
+    item is the (channel_name, channel_id) pair and value is the video list.
+    """
+    pool = FetchPool(max_workers=RSS_CONFIG.get('max_workers', 8),
+                     per_host_limit=RSS_CONFIG.get('per_host_limit', 4))
+    return pool.map(lambda ch: fetch_channel_rss_with_retry(ch[1], ch[0]),
+                    list(channels.items()),
+                    host_of=lambda ch: host_of_url(rss_feed_url(ch[1])))
+
+def rss_entry_qualifies(entry: Dict) -> bool:
+    """Age and skip-pattern filters for a parsed (or cached) feed entry."""
+    published_at = entry["published_at"]
+    if published_at:
+        try:
+            pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+            if (datetime.now(pub_date.tzinfo) - pub_date).days > FILTERING['max_age_days']:
+                return False
+        except ValueError: pass
+    return not quality_scorer.should_skip(entry["title"])
+
+def rss_entries_to_videos(entries: List[Dict], channel_name: str) -> List[Dict]:
+    """Turn qualifying feed entries into scored video records."""
+    videos = []
+    for entry in entries:
+        if not rss_entry_qualifies(entry): continue
+        video_id, title, description = entry["video_id"], entry["title"], entry["description"]
+        videos.append({"video_id": video_id, "title": title[:200], "url": f"https://www.youtube.com/watch?v={video_id}",
+            "description": description, "published_at": entry["published_at"], "channel": channel_name, "source": "rss"})
+    return score_videos(videos)
+
 def fetch_channel_rss(channel_id: str, channel_name: str):
-    rss_url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+    rss_url = rss_feed_url(channel_id)
     try:
-        result = subprocess.run(["curl", "-s", "-L", "-m", "10", rss_url], capture_output=True, text=True, timeout=10)
-        if result.returncode != 0:
+        # fetch_channel_rss_with_retry owns the retry loop
+        resp = http.get(rss_url, headers=rss_cache.conditional_headers(channel_id), timeout=10, retries=0)
+        if resp.status == 304:
+            cached = rss_cache.not_modified(channel_id)
+            if cached is not None:
+                return rss_entries_to_videos(cached, channel_name)
+            resp = http.get(rss_url, timeout=10, retries=0)  # cache lost the record; refetch unconditionally
+        if not resp.ok:
             failure_tracker.record_rss_failure()
             return []
-        content = result.stdout
-        if "Channel not found" in content or "No longer available" in content:
+        body = resp.body
+        if b"Channel not found" in body or b"No longer available" in body:
             failure_tracker.record_rss_failure()
             return []
-        videos = []
-        entries = re.findall(r'<entry>(.*?)</entry>', content, re.DOTALL)
-        if not entries:
-            video_ids = re.findall(r'<yt:videoId>([^<]+)</yt:videoId>', content)
+        try:
+            # Stops parsing as soon as enough qualifying entries have been seen
+            entries = collect_rss_entries(body, OUTPUT_CONFIG['max_videos_per_channel'], accept=rss_entry_qualifies)
+        except ET.ParseError:
+            videos = []
+            video_ids = re.findall(r'<yt:videoId>([^<]+)</yt:videoId>', resp.text)
             for vid in video_ids[:OUTPUT_CONFIG['max_videos_per_channel']]:
                 videos.append({"video_id": vid, "title": "RSS Video", "url": f"https://www.youtube.com/watch?v={vid}",
                     "description": "", "published_at": "", "channel": channel_name, "source": "rss", "quality_score": 0.0})
             return videos
-        for entry in entries[:OUTPUT_CONFIG['max_videos_per_channel']]:
-            video_id_match = re.search(r'<yt:videoId>([^<]+)</yt:videoId>', entry)
-            if not video_id_match: continue
-            video_id = video_id_match.group(1)
-            title = re.search(r'<title>([^<]+)</title>', entry).group(1) if re.search(r'<title>([^<]+)</title>', entry) else "No title"
-            desc_match = re.search(r'<media:description>([^<]+)</media:description>', entry, re.DOTALL)
-            description = desc_match.group(1)[:500] if desc_match else ""
-            pub_match = re.search(r'<published>([^<]+)</published>', entry)
-            published_at = pub_match.group(1) if pub_match else ""
-            if published_at:
-                try:
-                    pub_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                    if (datetime.now(pub_date.tzinfo) - pub_date).days > FILTERING['max_age_days']:
-                        continue
-                except: pass
-            skip = any(pattern.lower() in title.lower() for pattern in FILTERING['skip_patterns'])
-            if skip: continue
-            videos.append({"video_id": video_id, "title": title[:200], "url": f"https://www.youtube.com/watch?v={video_id}",
-                "description": description, "published_at": published_at, "channel": channel_name, "source": "rss",
-                "quality_score": calculate_quality_score(title, description, channel_name)})
-        return videos
+        rss_cache.store(channel_id, resp.header("etag"), resp.header("last-modified"), entries)
+        return rss_entries_to_videos(entries, channel_name)
     except Exception as e:
         failure_tracker.record_rss_failure()
         return []
 
+class ApiUnavailable(Exception):
+    """No API key, budget used up, or the API reported quotaExceeded - retrying won't help."""
+
 def search_youtube_api(query: str, max_retries: int = 3):
+    # Empty results are a valid answer; only transient errors are retried (each attempt costs 100 units)
     for attempt in range(max_retries):
         try:
-            videos = _do_api_search(query)
-            if videos or attempt == max_retries - 1:
-                return videos, False
-            time.sleep(1 * (attempt + 1))
+            return _do_api_search(query), False
+        except ApiUnavailable as e:
+            log(f"API Search {query[:30]}: {e}", "WARNING")
+            break
         except Exception as e:
             if attempt == max_retries - 1:
                 log(f"API Search {query[:30]}: {e}", "ERROR")
-                if FALLBACK_CONFIG.get('scrape_fallback', True):
-                    videos = search_youtube_scrape(query)
-                    return videos, True
-                failure_tracker.record_search_failure()
-                return [], False
+                break
             time.sleep(1 * (attempt + 1))
+    if FALLBACK_CONFIG.get('scrape_fallback', True):
+        return search_youtube_scrape(query), True
+    failure_tracker.record_search_failure()
     return [], False
 
+def is_quota_error(data: dict) -> bool:
+    error = data.get('error', {})
+    reasons = {e.get('reason', '') for e in error.get('errors', [])}
+    return 'quota' in error.get('message', '').lower() or bool(reasons & {'quotaExceeded', 'dailyLimitExceeded'})
+
 def _do_api_search(query: str):
-    import urllib.parse
+    if not YOUTUBE_API_KEY:
+        raise ApiUnavailable("YOUTUBE_API_KEY not set")
+    if not quota_budget.try_charge(SEARCH_COST):
+        raise ApiUnavailable(f"quota budget exhausted ({quota_budget.used} units used, reserve {quota_budget.reserve_units})")
     days_back = SEARCH_CONFIG['published_after_days']
     published_after = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%dT%H:%M:%SZ")
     max_results = min(SEARCH_CONFIG['max_results_per_topic'], 50)
-    url = f"https://www.googleapis.com/youtube/v3/search?part=snippet&q={urllib.parse.quote(query)}&type=video&order=relevance&publishedAfter={published_after}&maxResults={max_results}&key={YOUTUBE_API_KEY}"
-    result = subprocess.run(["curl", "-s", "-m", "10", url], capture_output=True, text=True, timeout=15)
-    if result.returncode != 0: raise Exception("curl failed")
-    data = json.loads(result.stdout)
+    params = {"part": "snippet", "q": query, "type": "video", "order": "relevance",
+              "publishedAfter": published_after, "maxResults": max_results, "key": YOUTUBE_API_KEY}
+    # search_youtube_api owns the retry loop; every attempt costs quota
+    data = http.get("https://www.googleapis.com/youtube/v3/search", params=params, timeout=10, retries=0).json()
     if 'error' in data:
         error_msg = data['error'].get('message', 'Unknown error')
-        if 'quota' in error_msg.lower():
+        if is_quota_error(data):
             failure_tracker.record_search_failure()
-            raise Exception(f"Quota exceeded: {error_msg}")
+            quota_budget.mark_exhausted()
+            raise ApiUnavailable(f"Quota exceeded: {error_msg}")
         raise Exception(error_msg)
     videos = []
     for item in data.get('items', []):
@@ -522,78 +589,145 @@ def _do_api_search(query: str):
         title = snippet.get('title', 'No title')
         description = snippet.get('description', '')[:500]
         channel = snippet.get('channelTitle', 'Unknown')
-        skip = any(pattern.lower() in title.lower() for pattern in FILTERING['skip_patterns'])
-        if skip: continue
+        if quality_scorer.should_skip(title): continue
         videos.append({"video_id": video_id, "title": title[:200], "url": f"https://www.youtube.com/watch?v={video_id}",
-            "description": description, "published_at": snippet.get('publishedAt', ''), "channel": channel, "source": "search", "query": query,
-            "quality_score": calculate_quality_score(title, description, channel)})
-    return videos
+            "description": description, "published_at": snippet.get('publishedAt', ''), "channel": channel, "source": "search", "query": query})
+    return score_videos(videos)
 
 def search_youtube_scrape(query: str):
     failure_tracker.record_scrape_fallback()
-    import urllib.parse
     videos = []
-    search_url = f"https://www.youtube.com/results?search_query={urllib.parse.quote(query)}&sp=CAI%253D"
     try:
-        result = subprocess.run(["curl", "-s", "-L", "-A", "Mozilla/5.0", "-m", "10", search_url], capture_output=True, text=True, timeout=15)
-        if result.returncode != 0: return []
-        content = result.stdout
-        video_ids = re.findall(r'"videoId":"([^"]+)"', content)[:20]
-        titles = re.findall(r'"title":{"runs":\[{"text":"([^"]+)"', content)
-        channel_names = re.findall(r'"longBylineText":{"runs":\[{"text":"([^"]+)"', content)
-        seen = set()
-        for i, video_id in enumerate(video_ids):
-            if video_id in seen: continue
-            seen.add(video_id)
-            title = titles[i] if i < len(titles) else "No title"
-            skip = any(pattern.lower() in title.lower() for pattern in FILTERING['skip_patterns'])
-            if skip: continue
-            channel = channel_names[i] if i < len(channel_names) else "Unknown"
-            videos.append({"video_id": video_id, "title": title[:200], "url": f"https://www.youtube.com/watch?v={video_id}",
-                "description": "", "published_at": "", "channel": channel, "source": "scrape", "query": query,
-                "quality_score": calculate_quality_score(title, "", channel)})
+        resp = http.get("https://www.youtube.com/results", params={"search_query": query, "sp": "CAI%3D"},
+                        headers=BROWSER_HEADERS, timeout=10)
+        if not resp.ok: return []
+        for item in extract_search_results(resp.text, max_videos=20).videos:
+            if quality_scorer.should_skip(item["title"]): continue
+            video_id = item["video_id"]
+            videos.append({"video_id": video_id, "title": item["title"][:200], "url": f"https://www.youtube.com/watch?v={video_id}",
+                "description": item["description"][:500], "published_at": "", "channel": item["channel"],
+                "duration_seconds": item["duration_seconds"], "view_count": item["view_count"],
+                "source": "scrape", "query": query})
     except Exception as e:
         log(f"Scrape {query[:30]}: {e}", "ERROR")
-    return videos
+    return score_videos(videos)
 
 def search_youtube(query: str):
     videos, _ = search_youtube_api(query)
     return videos
 
-def calculate_quality_score(title: str, description: str, channel: str):
-    score = 0.0
-    title_lower = title.lower()
-    for term in QUALITY_TERMS['high_value_terms']:
-        if term in title_lower: score += SCORING['high_value_bonus']
-    for term in QUALITY_TERMS['medium_terms']:
-        if term in title_lower: score += SCORING['medium_bonus']
-    if len(description) > SCORING['long_description_threshold']:
-        score += SCORING['long_description_bonus']
-    elif len(description) > SCORING['medium_description_threshold']:
-        score += SCORING['medium_description_bonus']
-    for term in QUALITY_TERMS['low_effort_terms']:
-        if term in title_lower: score -= SCORING['low_effort_penalty']
-    for term in QUALITY_TERMS['duration_terms']:
-        if term in title_lower: score += SCORING['duration_bonus']
-    score += SCORING.get('rss_bonus', 0.0) + SCORING.get('search_penalty', 0.0) + SCORING.get('scrape_penalty', -0.5)
+def _score_adjustment():
+    """Source/fallback terms from config plus run-level failure penalties (same for every video)."""
+    score = SCORING.get('rss_bonus', 0.0) + SCORING.get('search_penalty', 0.0) + SCORING.get('scrape_penalty', -0.5)
     score += failure_tracker.get_rss_penalty() + failure_tracker.get_search_penalty() + failure_tracker.get_scrape_penalty()
     if FALLBACK_CONFIG.get('global_fallback', True):
         score += SCORING.get('fallback_penalty', -0.2)
     return score
 
-def deduplicate_videos(videos: List[Dict], history: dict):
-    existing_ids = {v.get("video_id") for v in history.get("recommended_videos", [])}
-    unique = []
+def score_videos(videos: List[Dict]) -> List[Dict]:
+    """Set quality_score on a batch of videos in one pass over the compiled term matcher."""
+    adjustment = _score_adjustment()
+    for video, score in zip(videos, quality_scorer.score_many(videos)):
+        video["quality_score"] = score + adjustment
+    return videos
+
+def deduplicate_videos(videos: List[Dict], seen) -> List[Dict]:
+    """Drop already-recommended videos and merge same-run hits from several sources.
+
+    seen is any container of video IDs (the persistent VideoIndex in main).
+    When the same video arrives via RSS, search and scrape, the highest-scoring
+    record is kept and the others only contribute their source names and a
+    description if the kept record has none.
+    """
+    unique = {}
     for video in videos:
-        if video["video_id"] not in existing_ids and video["video_id"] not in [v["video_id"] for v in unique]:
-            unique.append(video)
-    return unique
+        video_id = video["video_id"]
+        if video_id in seen:
+            continue
+        kept = unique.get(video_id)
+        if kept is None:
+            video["sources"] = [video.get("source", "")]
+            unique[video_id] = video
+            continue
+        sources = kept["sources"] + [s for s in [video.get("source", "")] if s not in kept["sources"]]
+        if video.get("quality_score", 0) > kept.get("quality_score", 0):
+            video["description"] = video.get("description") or kept.get("description", "")
+            kept = unique[video_id] = video
+        elif not kept.get("description"):
+            kept["description"] = video.get("description", "")
+        kept["sources"] = sources
+    return list(unique.values())
+
+# ====== ENRICHMENT ======
+def fetch_video_details(video_ids: List[str]) -> List[Dict]:
+    params = {"part": VIDEOS_PARTS, "id": ",".join(video_ids), "maxResults": BATCH_SIZE, "key": YOUTUBE_API_KEY}
+    data = http.get(VIDEOS_URL, params=params, timeout=15).json()
+    if 'error' in data:
+        if is_quota_error(data):
+            quota_budget.mark_exhausted()
+        raise ApiUnavailable(data['error'].get('message', 'Unknown error'))
+    return data.get('items', [])
 
-def rank_videos(videos: List[Dict]):
-    return sorted(videos, key=lambda x: x.get("quality_score", 0), reverse=True)
+def enrich_videos(videos: List[Dict]) -> List[Dict]:
+    """Add real duration, views and likes (and full descriptions) to the run's candidates.
 
-def create_notion_page(video: Dict):
-    """Create page in 知识中心 database"""
+    Drops videos shorter than filtering.min_duration_minutes and ones the API no longer
+    returns. Without an API key only durations/views scraped from the results page are used.
+    """
+    details = {}
+    if YOUTUBE_API_KEY and DETAILS_CONFIG.get('enabled', True):
+        fetcher = VideoDetailsFetcher(video_details_cache, fetch_video_details, quota_budget.try_charge)
+        details = fetcher.lookup(v["video_id"] for v in videos)
+        stats = fetcher.stats
+        log(f"🔎 Details: {len(details)}/{len(videos)} videos ({stats['cached']} cached, "
+            f"{stats['calls']} videos.list calls, {stats['not_fetched']} skipped)")
+        if fetcher.error:
+            log(f"  ⚠️ videos.list: {fetcher.error}", "WARNING")
+        try:
+            video_details_cache.save()
+        except OSError as e:
+            log(f"Failed to save video details cache: {e}", "WARNING")
+
+    min_seconds = FILTERING.get('min_duration_minutes', 0) * 60
+    kept, too_short, unavailable = [], 0, 0
+    for video in videos:
+        info = details.get(video["video_id"])
+        if info:
+            if info.get("unavailable"):
+                unavailable += 1
+                continue
+            old_description = video.get("description", "") or ""
+            if len(info["description"]) > len(old_description):
+                video["description"] = info["description"][:500]
+                video["quality_score"] = (video.get("quality_score", 0) - quality_scorer.score(video["title"], old_description)
+                                          + quality_scorer.score(video["title"], video["description"]))
+            for key in ("duration_seconds", "view_count", "like_count", "like_ratio"):
+                if info.get(key) is not None:
+                    video[key] = info[key]
+            video["published_at"] = video.get("published_at") or info.get("published_at", "")
+        duration = video.get("duration_seconds")
+        if min_seconds and duration is not None and duration < min_seconds:
+            too_short += 1
+            continue
+        kept.append(video)
+    if too_short or unavailable:
+        log(f"  ⏭️ Dropped {too_short} videos under {FILTERING.get('min_duration_minutes', 0)} min, {unavailable} unavailable")
+    return kept
+
+def rank_videos(videos: List[Dict], top_k: int = None):
+    """All videos by rank_score, or the top_k picks under the per-channel/per-topic caps and MMR diversity."""
+    if top_k is None:
+        return ranker.top_k(videos)
+    ranker.score_all(videos)
+    picks = selector.select(videos, top_k)
+    stats = selector.last_stats
+    if stats["capped_channel"] or stats["capped_topic"] or stats["near_duplicates"]:
+        log(f"🎯 Selection: skipped {stats['capped_channel']} over channel cap, {stats['capped_topic']} over topic cap, "
+            f"{stats['near_duplicates']} near-duplicate titles")
+    return picks
+
+def video_page_payload(video: Dict) -> Dict:
+    """Page payload for the 知识中心 results database"""
     properties = {
         "Goal name": {"title": [{"text": {"content": video["title"][:190]}}]},
         "Category": {"select": {"name": NOTION_CONFIG['category']}}
@@ -622,25 +756,96 @@ def create_notion_page(video: Dict):
             "rich_text": [{"type": "text", "text": {"content": "🔗 Watch Video", "link": {"url": video["url"]}}}]
         }}
     ]
-    payload = {"parent": {"database_id": RESULTS_DB_ID}, "properties": properties, "children": content_blocks}
-    cmd = ["curl", "-s", "-X", "POST", "https://api.notion.com/v1/pages",
-           "-H", f"Authorization: Bearer {NOTION_API_KEY}",
-           "-H", "Notion-Version: 2025-09-03",
-           "-H", "Content-Type: application/json", "-d", json.dumps(payload)]
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode == 0:
-            log(f"    ✓ {video['title'][:50]}... (score: {video.get('quality_score', 0):.1f})")
-            return True
-        log(f"    ✗ Failed to create Notion page", "ERROR")
-        return False
-    except Exception as e:
-        log(f"    ✗ Error: {e}", "ERROR")
-        return False
+    return {"parent": {"database_id": RESULTS_DB_ID}, "properties": properties, "children": content_blocks}
+
+def create_notion_page(video: Dict):
+    """Queue page creation in 知识中心; returns a Future resolving to a WriteResult"""
+    return notion_writer.create_page(video_page_payload(video), notion_version="2025-09-03")
+
+# ====== ENTRY POINTS ======
+def configure(config: ScouterConfig):
+    """Apply a config: module settings plus the long-lived clients, caches and indexes built from it."""
+    global settings, YOUTUBE_API_KEY, NOTION_API_KEY, TRANSCRIPT_API_KEY, CHANNEL_DB_ID, RESULTS_DB_ID, LOG_DB_ID
+    global SOURCES, RSS_CONFIG, SEARCH_CONFIG, DETAILS_CONFIG, FALLBACK_CONFIG, FILTERING, QUALITY_TERMS, SCORING
+    global NOTION_CONFIG, OUTPUT_CONFIG, VIDEOS_PATH
+    global notion_writer, quota_budget, quality_scorer, ranker, selector, rss_cache, video_details_cache, video_index
+    global channel_mirror, channel_resolver
+    shutdown()
+    settings = config
+    YOUTUBE_API_KEY = config.youtube_api_key
+    NOTION_API_KEY = config.notion_api_key
+    TRANSCRIPT_API_KEY = config.transcript_api_key
+    CHANNEL_DB_ID = config.notion['channel_db_id']
+    RESULTS_DB_ID = config.notion['results_db_id']
+    LOG_DB_ID = config.notion['log_db_id']
+    SOURCES, RSS_CONFIG, SEARCH_CONFIG, DETAILS_CONFIG = config.sources, config.rss, config.search, config.details
+    FALLBACK_CONFIG, FILTERING, QUALITY_TERMS = config.fallback, config.filtering, config.quality_terms
+    SCORING, NOTION_CONFIG, OUTPUT_CONFIG = config.scoring, config.notion, config.output
+    VIDEOS_PATH = OUTPUT_CONFIG['videos_path']
+
+    notion_writer = NotionWriter(NOTION_API_KEY, rate=NOTION_CONFIG.get('write_rate', 3.0),
+                                 workers=NOTION_CONFIG.get('write_workers', 3), http=http)
+    quota_budget = QuotaBudget(SEARCH_CONFIG.get('quota_path', 'youtube-scouter-quota.json'),
+                               daily_limit=SEARCH_CONFIG.get('daily_quota', 10000),
+                               reserve_units=SEARCH_CONFIG.get('quota_reserve', 0) * SEARCH_COST)
+    quality_scorer = QualityScorer(QUALITY_TERMS, SCORING, FILTERING['skip_patterns'])
+    ranker = Ranker(SCORING.get('weights', DEFAULT_WEIGHTS), SCORING)
+    selector = DiverseSelector(per_channel=OUTPUT_CONFIG.get('max_submissions_per_channel'),
+                               per_topic=OUTPUT_CONFIG.get('max_videos_per_search'),
+                               mmr_lambda=OUTPUT_CONFIG.get('mmr_lambda', 0.7),
+                               max_similarity=OUTPUT_CONFIG.get('max_title_similarity', 0.8))
+    rss_cache = RssCache(RSS_CONFIG.get('cache_path', 'youtube-scouter-rss-cache.json'),
+                         max_age_days=RSS_CONFIG.get('cache_max_age_days', 14),
+                         max_entries=RSS_CONFIG.get('cache_max_entries', 2000))
+    video_details_cache = VideoDetailsCache(DETAILS_CONFIG.get('cache_path', 'youtube-scouter-video-details.json'),
+                                            ttl_hours=DETAILS_CONFIG.get('cache_hours', 24),
+                                            max_entries=DETAILS_CONFIG.get('cache_max_entries', 5000))
+    video_index = VideoIndex(OUTPUT_CONFIG.get('index_path', 'youtube-scouter-index.db'),
+                             seed=lambda: get_history_store().video_ids(),
+                             seed_mark=lambda: len(get_history_store()))
+    channel_mirror = ChannelMirror(
+        NOTION_CONFIG.get('channel_mirror_path', 'youtube-scouter-channels.json'),
+        query=lambda body: notion_post(f"https://api.notion.com/v1/databases/{CHANNEL_DB_ID}/query", body, idempotent=True),
+        full_resync_hours=NOTION_CONFIG.get('channel_full_resync_hours', 168))
+    channel_resolver = ChannelResolver(
+        ResolverCache(NOTION_CONFIG.get('channel_resolver_path', 'youtube-scouter-resolver.json'),
+                      base_backoff_hours=NOTION_CONFIG.get('channel_resolve_backoff_hours', 6)),
+        resolve_url=resolve_channel_id_via_transcriptapi, find_channel_url=find_channel_url)
+
+def shutdown():
+    """Drain the Notion write queue and close the index and history; configure() or run() rebuilds them."""
+    global settings, notion_writer, video_index, _history_store
+    if notion_writer is not None:
+        notion_writer.close()
+        notion_writer = None
+    if video_index is not None:
+        video_index.close()
+        video_index = None
+    if _history_store is not None:
+        _history_store.close()
+        _history_store = None
+    settings = None
+
+def run(config: ScouterConfig = None, test_mode: bool = False) -> bool:
+    """One scouting pass. The first call (or an edited config file) sets everything up; later passes reuse it.
+
+    Without a config the YAML at CONFIG_PATH is used, reloaded only when it changed since the last pass.
+    """
+    global failure_tracker, metrics
+    if config is None:
+        config = settings if settings is not None and not settings.is_stale() else ScouterConfig.load(CONFIG_PATH)
+    if config is not settings:
+        configure(config)
+    log_lines.clear()
+    failure_tracker = FailureTracker()
+    metrics = new_run_metrics()
+    # The caches and the writer outlive a pass; their counters start over so each log reports one pass
+    for component in (notion_writer, rss_cache, video_details_cache, channel_resolver.cache):
+        component.reset_stats()
+    return main(test_mode)
 
-# ====== MAIN FUNCTION ======
 def main(test_mode: bool = False):
-    global failure_tracker
+    """The pass itself; expects configure() to have run (use run())."""
     success = False
     error_msg = None
     
@@ -656,14 +861,24 @@ def main(test_mode: bool = False):
         # Fetch channels from Notion
         if RSS_CONFIG['enabled']:
             log("📡 Fetching channels from Notion...")
-            channels = fetch_channels_from_notion()
+            with metrics.span("notion_channels") as span:
+                channels = fetch_channels_from_notion()
+                span["channels"] = len(channels)
             if not channels:
                 log("⚠️ No channels found in Notion! Using search only.", "WARNING")
             else:
                 log(f"📡 Fetching from {len(channels)} channels...")
                 rss_videos = []
-                for channel_name, channel_id in channels.items():
-                    videos = fetch_channel_rss_with_retry(channel_id, channel_name)
+                rss_start = time.monotonic()
+                with metrics.span("rss", channels=len(channels)) as span:
+                    results = fetch_all_channel_rss(channels)
+                    span["videos"] = sum(len(r.value or []) for r in results)
+                for result in results:
+                    channel_name, _ = result.item
+                    videos = result.value or []
+                    if result.error:
+                        log(f"RSS {channel_name}: {result.error}", "ERROR")
+                        failure_tracker.record_rss_failure()
                     
                     # If name was a placeholder (Unknown-xxx), try to get actual name from RSS
                     display_name = channel_name
@@ -678,27 +893,48 @@ def main(test_mode: bool = False):
                             for v in videos:
                                 v["channel"] = actual_name
                         rss_videos.extend(videos)
-                        log(f"  ✓ {display_name}: {len(videos)} videos")
+                        log(f"  ✓ {display_name}: {len(videos)} videos ({result.elapsed:.2f}s)")
                     else:
-                        log(f"  ✗ {display_name}: failed")
-                    time.sleep(0.2)
+                        log(f"  ✗ {display_name}: failed ({result.elapsed:.2f}s)")
+                if results:
+                    slowest = max(results, key=lambda r: r.elapsed)
+                    log(f"  ⏱️ RSS phase: {time.monotonic() - rss_start:.2f}s wall, "
+                        f"{sum(r.elapsed for r in results):.2f}s summed, slowest {slowest.item[0]} ({slowest.elapsed:.2f}s)")
+                    log(f"  💾 RSS cache: {rss_cache.hits} not modified, {rss_cache.misses} downloaded")
+                try:
+                    rss_cache.save()
+                except OSError as e:
+                    log(f"Failed to save RSS cache: {e}", "WARNING")
                 if rss_videos:
                     all_videos.extend(rss_videos)
                     rss_success = True
                     log(f"  → RSS: {len(rss_videos)} videos from {len(rss_videos)//OUTPUT_CONFIG['max_videos_per_channel']} channels")
         
-        # Search by topics
+        # Search by topics: the quota plan decides up front which topics use the API
         if SEARCH_CONFIG['enabled']:
-            log(f"\n🔍 Search: {len(SEARCH_CONFIG['topics'])} topics")
+            topics = SEARCH_CONFIG['topics']
+            api_topics, scrape_topics = quota_budget.plan(topics) if YOUTUBE_API_KEY else ([], list(topics))
+            log(f"\n🔍 Search: {len(topics)} topics ({len(api_topics)} via API, {len(scrape_topics)} via scrape, "
+                f"{quota_budget.available} quota units available)")
+            if scrape_topics and not FALLBACK_CONFIG.get('scrape_fallback', True):
+                log(f"  ⚠️ Scrape fallback disabled - skipping {len(scrape_topics)} topics over budget", "WARNING")
+                scrape_topics = []
             search_videos = []
-            for query in SEARCH_CONFIG['topics']:
-                videos = search_youtube(query)
-                if videos:
-                    search_videos.extend(videos)
-                    log(f"  ✓ {query[:35]}... → {len(videos)}")
-                else:
-                    log(f"  ✗ {query[:35]}... → 0")
-                time.sleep(0.5)
+            for stage, stage_topics, search in (("search", api_topics, search_youtube),
+                                                ("scrape", scrape_topics, search_youtube_scrape)):
+                if not stage_topics:
+                    continue
+                with metrics.span(stage, topics=len(stage_topics)) as span:
+                    found = len(search_videos)
+                    for query in stage_topics:
+                        videos = search(query)
+                        if videos:
+                            search_videos.extend(videos)
+                            log(f"  ✓ {query[:35]}... → {len(videos)}")
+                        else:
+                            log(f"  ✗ {query[:35]}... → 0")
+                        time.sleep(0.5)
+                    span["videos"] = len(search_videos) - found
             if search_videos:
                 all_videos.extend(search_videos)
                 search_success = True
@@ -709,10 +945,11 @@ def main(test_mode: bool = False):
             log("⚠️ No videos from primary sources!", "WARNING")
             if FALLBACK_CONFIG.get('scrape_fallback', True) and SEARCH_CONFIG['topics']:
                 log("  Trying emergency scrape fallback...")
-                for query in SEARCH_CONFIG['topics'][:5]:
-                    videos = search_youtube_scrape(query)
-                    all_videos.extend(videos)
-                    time.sleep(0.5)
+                with metrics.span("scrape", topics=len(SEARCH_CONFIG['topics'][:5]), emergency=True):
+                    for query in SEARCH_CONFIG['topics'][:5]:
+                        videos = search_youtube_scrape(query)
+                        all_videos.extend(videos)
+                        time.sleep(0.5)
             if not all_videos:
                 log("❌ All sources failed. Check API quota, network, and channel IDs.", "ERROR")
                 raise Exception("All sources failed - no videos found")
@@ -720,9 +957,22 @@ def main(test_mode: bool = False):
         log(f"\n📊 Total: {len(all_videos)} videos found")
         log(f"   RSS: {'✓' if rss_success else '✗'} | Search: {'✓' if search_success else '✗'}")
         
-        history = load_video_history()
-        unique_videos = deduplicate_videos(all_videos, history)
+        with metrics.span("dedup", videos=len(all_videos)) as span:
+            unique_videos = deduplicate_videos(all_videos, video_index)
+            span["unique"] = len(unique_videos)
         log(f"🆕 Unique: {len(unique_videos)} videos")
+        if SEARCH_CONFIG['enabled']:
+            new_per_topic = {}
+            for v in unique_videos:
+                if v.get("query"):
+                    new_per_topic[v["query"]] = new_per_topic.get(v["query"], 0) + 1
+            for topic in SEARCH_CONFIG['topics']:
+                quota_budget.record_yield(topic, new_per_topic.get(topic, 0))
+
+        if unique_videos:
+            with metrics.span("enrich", videos=len(unique_videos)) as span:
+                unique_videos = enrich_videos(unique_videos)
+                span["kept"] = len(unique_videos)
         
         if not unique_videos:
             if test_mode:
@@ -731,8 +981,8 @@ def main(test_mode: bool = False):
                 raise KeyboardInterrupt("Test mode - no new videos")
             log("⚠️ No new unique videos found", "WARNING")
         
-        ranked = rank_videos(unique_videos)
-        top_videos = ranked[:OUTPUT_CONFIG['top_videos_to_submit']]
+        with metrics.span("rank", videos=len(unique_videos)):
+            top_videos = rank_videos(unique_videos, OUTPUT_CONFIG['top_videos_to_submit'])
         
         if test_mode:
             log(f"\nTEST MODE - Top {len(top_videos)}:")
@@ -741,23 +991,35 @@ def main(test_mode: bool = False):
                 channel = v.get("channel", "Unknown")
                 query = v.get("query", "")
                 query_str = f" | {query[:20]}..." if query else ""
-                score = v.get('quality_score', 0)
+                score = v.get('rank_score', 0)
                 log(f"  {i}. {v['title'][:45]}... 📊 {score:.1f} | {source.upper()} | {channel}{query_str}")
             success = True
             raise KeyboardInterrupt("Test mode complete")
         
         log(f"\n📤 Submitting to Notion...")
+        history = get_history_store()
         submitted = 0
         today = datetime.now().strftime("%Y-%m-%d")
-        for video in top_videos:
-            if create_notion_page(video):
-                submitted += 1
-                history["recommended_videos"].append({
-                    "video_id": video["video_id"], "title": video["title"],
-                    "url": video["url"], "recommended_date": today,
-                    "topic": video.get("channel", "") or video.get("query", "")
-                })
-        save_video_history(history)
+        with metrics.span("submit", videos=len(top_videos)) as span:
+            pending = [(video, create_notion_page(video)) for video in top_videos]
+            for video, future in pending:
+                result = future.result()
+                if result.ok:
+                    log(f"    ✓ {video['title'][:50]}... (score: {video.get('rank_score', 0):.1f})")
+                    submitted += 1
+                    # Appended per video so a crash mid-run still records what was already submitted
+                    history.append([{
+                        "video_id": video["video_id"], "title": video["title"],
+                        "url": video["url"], "recommended_date": today,
+                        "topic": video.get("channel", "") or video.get("query", "")
+                    }])
+                    video_index.add(video["video_id"])
+                else:
+                    log(f"    ✗ Failed to create Notion page: {result.error}", "ERROR")
+            span["submitted"] = submitted
+        metrics.set("videos_submitted", submitted)
+        for line in notion_writer.report():
+            log(f"   ⏱️ Notion {line}")
         
         log(f"\n✅ COMPLETED: {submitted}/{OUTPUT_CONFIG['top_videos_to_submit']} submitted")
         log(f"   RSS: {rss_success} | Search: {search_success} | Fallback: {failure_tracker.scrape_fallbacks > 0}")
@@ -771,10 +1033,19 @@ def main(test_mode: bool = False):
         log(f"\n❌ ERROR: {e}", "ERROR")
         success = False
     finally:
+        try:
+            quota_budget.save()
+            log(f"📈 YouTube API quota: {quota_budget.summary()}")
+        except OSError as e:
+            log(f"Failed to save quota state: {e}", "WARNING")
+        for line in metrics.summary_lines():
+            log(f"⏱️ {line}")
         log("\n==========================================================")
         log("Saving logs and pushing to Notion...")
         save_log_to_file()
-        push_log_to_notion(success, error_msg)
+        with metrics.span("log_push"):
+            push_log_to_notion(success, error_msg)
+        write_metrics(bool(success))
         log("==========================================================")
         
     return success
@@ -782,7 +1053,7 @@ def main(test_mode: bool = False):
 if __name__ == "__main__":
     test_mode = "--test" in sys.argv
     try:
-        success = main(test_mode=test_mode)
+        success = run(test_mode=test_mode)
         sys.exit(0 if success else 1)
     except Exception as e:
         error_msg = str(e) + "\n" + traceback.format_exc()
@@ -0,0 +1,162 @@
+"""
+Extractor for the ytInitialData blob embedded in YouTube results pages.
+
+The page is a few hundred KB of HTML and script; the search results live in
+one JSON object assigned to ytInitialData. That object is located once and
+decoded in a single pass with JSONDecoder.raw_decode (which stops at the end
+of the object, ignoring the rest of the page), then the tree is walked for
+videoRenderer / channelRenderer nodes without descending into them. Each
+renderer becomes one record, so a video's title, channel, duration and view
+count always belong together.
+"""
+
+import json
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+MARKERS = ("var ytInitialData = ", 'window["ytInitialData"] = ', "ytInitialData = ")
+RENDERERS = ("videoRenderer", "channelRenderer")
+
+_decoder = json.JSONDecoder()
+_COUNT_RE = re.compile(r"([\d.,]+)\s*([KMB])?", re.IGNORECASE)
+_SCALE = {"K": 10**3, "M": 10**6, "B": 10**9}
+
+
+class SearchResults(NamedTuple):
+    videos: List[Dict]
+    channels: List[Dict]
+
+
+def find_initial_data(html: str) -> Optional[dict]:
+    """The decoded ytInitialData object, or None if the page has none (consent wall, layout change)."""
+    for marker in MARKERS:
+        start = html.find(marker)
+        if start < 0:
+            continue
+        start += len(marker)
+        while start < len(html) and html[start].isspace():
+            start += 1
+        try:
+            data, _ = _decoder.raw_decode(html, start)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def iter_renderers(data, kinds: Tuple[str, ...] = RENDERERS) -> Iterator[Tuple[str, dict]]:
+    """(kind, node) for every renderer of the given kinds, in page order."""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            children = []
+            for key, value in node.items():
+                if key in kinds and isinstance(value, dict):
+                    yield key, value
+                elif isinstance(value, (dict, list)):
+                    children.append(value)
+            stack.extend(reversed(children))
+        elif isinstance(node, list):
+            stack.extend(reversed([v for v in node if isinstance(v, (dict, list))]))
+
+
+def text_of(value) -> str:
+    """Plain text of a {"simpleText": ...} or {"runs": [{"text": ...}, ...]} field."""
+    if not isinstance(value, dict):
+        return ""
+    if "simpleText" in value:
+        return value["simpleText"]
+    return "".join(run.get("text", "") for run in value.get("runs", []))
+
+
+def parse_duration(text: str) -> Optional[int]:
+    """Seconds from "1:02:03" / "10:34"; None for live streams or missing lengths."""
+    parts = text.strip().split(":") if text else []
+    if not parts or not all(p.isdigit() for p in parts):
+        return None
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def parse_count(text: str) -> Optional[int]:
+    """Views from "1,234 views" / "1.2M views"; 0 for "No views", None when there is no number."""
+    if not text:
+        return None
+    if text.lower().startswith("no "):
+        return 0
+    match = _COUNT_RE.search(text)
+    if not match:
+        return None
+    number, suffix = match.group(1).replace(",", ""), (match.group(2) or "").upper()
+    try:
+        return int(float(number) * _SCALE.get(suffix, 1))
+    except ValueError:
+        return None
+
+
+def _owner(node: dict) -> Tuple[str, str]:
+    """(channel name, channel ID); the bylines don't all carry the browse endpoint."""
+    name = channel_id = ""
+    for field in ("ownerText", "longBylineText", "shortBylineText"):
+        runs = node.get(field, {}).get("runs", [])
+        if not runs:
+            continue
+        name = name or runs[0].get("text", "")
+        channel_id = runs[0].get("navigationEndpoint", {}).get("browseEndpoint", {}).get("browseId", "")
+        if name and channel_id:
+            break
+    return name, channel_id
+
+
+def _description(node: dict) -> str:
+    snippets = node.get("detailedMetadataSnippets") or []
+    if snippets:
+        return text_of(snippets[0].get("snippetText"))
+    return text_of(node.get("descriptionSnippet"))
+
+
+def video_record(node: dict) -> Dict:
+    channel, channel_id = _owner(node)
+    return {
+        "video_id": node.get("videoId", ""),
+        "title": text_of(node.get("title")) or "No title",
+        "channel": channel or "Unknown",
+        "channel_id": channel_id,
+        "description": _description(node),
+        "duration_seconds": parse_duration(text_of(node.get("lengthText"))),
+        "view_count": parse_count(text_of(node.get("viewCountText"))),
+        "published_text": text_of(node.get("publishedTimeText")),
+    }
+
+
+def channel_record(node: dict) -> Dict:
+    browse = node.get("navigationEndpoint", {}).get("browseEndpoint", {})
+    return {
+        "channel_id": node.get("channelId", ""),
+        "title": text_of(node.get("title")),
+        "handle": (browse.get("canonicalBaseUrl") or "").lstrip("/"),
+    }
+
+
+def extract_search_results(html: str, max_videos: int = None) -> SearchResults:
+    """Videos (deduplicated by ID, at most max_videos) and channels from a results page, in page order."""
+    videos, channels, seen = [], [], set()
+    data = find_initial_data(html)
+    if data is None:
+        return SearchResults(videos, channels)
+    for kind, node in iter_renderers(data):
+        if kind == "channelRenderer":
+            if node.get("channelId"):
+                channels.append(channel_record(node))
+            continue
+        if max_videos is not None and len(videos) >= max_videos:
+            continue
+        video_id = node.get("videoId")
+        if video_id and video_id not in seen:
+            seen.add(video_id)
+            videos.append(video_record(node))
+    return SearchResults(videos, channels)